@@ -0,0 +1,35 @@
+import hashlib
+from typing import Any
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison (RFC 9110 §13.1.2), which is what If-None-Match uses."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return opaque in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+def conditional_json(
+    adapter: TypeAdapter,
+    content: Any,
+    if_none_match: str | None,
+    response: Response | None = None,
+) -> Response:
+    """
+    Validates content (ORM objects or row dicts) and serializes it with adapter,
+    tagging it with a weak ETag over the body. When the client already holds
+    that body the answer is a bodiless 304. Headers already set on the
+    route's injected `response` (X-Next-Cursor) are carried over. Responses
+    are private and must be revalidated before reuse.
+    """
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    headers = dict(response.headers) if response is not None else {}
+    headers.pop("content-length", None)
+    headers["ETag"] = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers["Cache-Control"] = "private, no-cache"
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -5,16 +6,33 @@ from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+@dataclass(frozen=True)
+class Principal:
+    """Who is making the request. Balances and counters are not part of it: read them from the row."""
+    id: int
+    email: str
+    username: str
+
+# Principals keyed by (user id, token issue time)
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.discard_where(lambda key: key[0] == user_id)
+
+def _principal(user: User) -> Principal:
+    return Principal(id=user.id, email=user.email, username=user.username)
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[AsyncSession, Depends(get_db)],
-):
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -30,8 +48,37 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalars().first()
+    user_id = payload.get("uid")
+    if user_id is None:
+        # Tokens issued before the uid claim existed
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+        return _principal(user)
+
+    cache_key = (user_id, payload.get("iat"))
+    cached = principal_cache.get(cache_key, None)
+    if cached is not None:
+        return cached
+
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
+    principal = _principal(user)
+    principal_cache.set(cache_key, principal)
+    return principal
+
+async def get_current_user_row(
+    principal: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
+    """The current user's row, for the routes that read or change its columns."""
+    user = await db.get(User, principal.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
@@ -0,0 +1,35 @@
+import base64
+import json
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        values = None
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+def decode_cursor_fields(cursor: str, **fields) -> tuple:
+    """
+    Decodes a cursor and converts the named fields in order, e.g.
+    decode_cursor_fields(cursor, title=str, id=int). Cursors come back from
+    clients, so a missing or mistyped field is a 400 like an undecodable one.
+    """
+    values = decode_cursor(cursor)
+    try:
+        converted = tuple(convert(values[name]) for name, convert in fields.items())
+    except (KeyError, TypeError, ValueError):
+        converted = None
+    # Integers also have to fit the database's BIGINT
+    if converted is None or any(isinstance(v, int) and not -2**63 <= v < 2**63 for v in converted):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return converted
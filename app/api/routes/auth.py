@@ -1,22 +1,23 @@
 from datetime import timedelta
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from pydantic import TypeAdapter
 
 from app.core import security
 from app.core.config import settings
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.conditional import conditional_json
+from app.api.deps import get_current_user_row, invalidate_principal
 from app.models.user import User
-from app.models.book import Book
-from app.models.transaction import Transaction, TransactionStatus
 from app.schemas.user import UserCreate, Token, UserResponse, UserUpdate
-from sqlalchemy import func
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+_user = TypeAdapter(UserResponse)
+
 @router.post("/register", response_model=UserResponse)
 async def register(user_in: UserCreate, db: Annotated[AsyncSession, Depends(get_db)]):
     # Check if user exists
@@ -28,7 +29,7 @@ async def register(user_in: UserCreate, db: Annotated[AsyncSession, Depends(get_
         )
 
     # Create new user
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await security.get_password_hash_async(user_in.password)
     user = User(
         email=user_in.email,
         username=user_in.username,
@@ -53,7 +54,7 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalars().first()
 
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    if not user or not await security.verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -62,39 +63,23 @@ async def login(
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-from app.models.book import Book, BookStatus
-from app.models.transaction import Transaction, TransactionStatus
-from app.schemas.user import UserCreate, Token, UserResponse, UserUpdate
-from sqlalchemy import func
-
-# ... imports ...
-
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    current_user: Annotated[User, Depends(get_current_user_row)],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    # Calculate Stats
-    # Books Listed
-    listed_res = await db.execute(select(func.count(Book.id)).where(Book.owner_id == current_user.id))
-    current_user.books_listed = listed_res.scalar() or 0
-
-    # Books Swapped (Received)
-    swapped_res = await db.execute(select(func.count(Transaction.id)).where(
-        (Transaction.receiver_id == current_user.id) & (Transaction.status == TransactionStatus.COMPLETED)
-    ))
-    current_user.books_swapped = swapped_res.scalar() or 0
-
-    return current_user
+    # Stats are counter columns on the user row (see app.services.user_stats),
+    # so this reads the row rather than the cached principal
+    return conditional_json(_user, current_user, if_none_match)
 
 @router.put("/me", response_model=UserResponse)
 async def update_user_me(
     user_in: UserUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_row)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
     if user_in.email:
@@ -108,20 +93,14 @@ async def update_user_me(
     if user_in.password:
         if not user_in.old_password:
              raise HTTPException(status_code=400, detail="Old password required to change password")
-        if not security.verify_password(user_in.old_password, current_user.password_hash):
+        if not await security.verify_password_async(user_in.old_password, current_user.password_hash):
              raise HTTPException(status_code=400, detail="Incorrect old password")
-        current_user.password_hash = security.get_password_hash(user_in.password)
+        current_user.password_hash = await security.get_password_hash_async(user_in.password)
 
     db.add(current_user)
     await db.commit()
     await db.refresh(current_user)
-
-    # Re-calculate stats for response consisteny
-    listed_res = await db.execute(select(func.count(Book.id)).where(Book.owner_id == current_user.id))
-    current_user.books_listed = listed_res.scalar() or 0
-    swapped_res = await db.execute(select(func.count(Transaction.id)).where(
-        (Transaction.receiver_id == current_user.id) & (Transaction.status == TransactionStatus.COMPLETED)
-    ))
-    current_user.books_swapped = swapped_res.scalar() or 0
+    if user_in.email or user_in.password:
+        invalidate_principal(current_user.id)
 
     return current_user
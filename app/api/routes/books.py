@@ -1,73 +1,340 @@
-from typing import List, Annotated
-import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from datetime import datetime, timezone
+from typing import List, Annotated, Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import joinedload
 
-from app.core.database import get_db
-from app.api.deps import get_current_user
-from app.models.user import User
+from app.core.database import AsyncSessionLocal, get_db
+from app.api.conditional import conditional_json, etag_matches
+from app.api.deps import Principal, get_current_user
+from app.api.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor_fields
 from app.models.book import Book, BookStatus
-from app.schemas.book import BookCreate, BookResponse
+from app.models.metadata_job import MetadataJob, MetadataJobState
+from app.schemas.book import BookCreate, BookResponse, BookBatchCreate, BookBatchResponse, BookBatchItemResult, MetadataJobResponse
+from app.core.cache import MISSING
+from app.core.config import settings
+from app.services import enrichment
+from app.services.book_metadata import get_book_metadata_many, peek_book_metadata, normalize_isbn
+from app.services.covers import cover_cache, CoverUnavailable
+from app.services.matching import matching_engine
+from app.services.watches import notify_watchers
+from app.services.search import search_books
+from app.services.user_stats import increment_books_listed
 
 router = APIRouter(prefix="/books", tags=["books"])
 
-async def fetch_google_books_data(isbn: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}")
-        if response.status_code != 200:
-            return None
-        data = response.json()
-        if "totalItems" in data and data["totalItems"] == 0:
-            return None
-
-        # Get first result
-        try:
-             volume_info = data["items"][0]["volumeInfo"]
-             title = volume_info.get("title", "Unknown Title")
-             authors = volume_info.get("authors", ["Unknown Author"])
-             author = ", ".join(authors)
-             image_links = volume_info.get("imageLinks", {})
-             image_url = image_links.get("thumbnail") or image_links.get("smallThumbnail")
-
-             return {
-                 "title": title,
-                 "author": author,
-                 "image_url": image_url
-             }
-        except (KeyError, IndexError):
-            return None
+_book = TypeAdapter(BookResponse)
+_book_list = TypeAdapter(List[BookResponse])
+# List pages read just these columns as plain rows; hydrating ORM entities costs more than the query
+_book_columns = [getattr(Book, name) for name in BookResponse.model_fields]
 
 @router.post("/", response_model=BookResponse)
 async def create_book(
     book_in: BookCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    # Fetch data
-    metadata = await fetch_google_books_data(book_in.isbn)
-    if not metadata:
+    """
+    Lists a book without waiting on Google Books. Known ISBNs are filled in
+    from the cache tiers; anything else is listed as PENDING_METADATA and
+    completed by the enrichment workers (poll GET /books/{id}/metadata).
+    """
+    metadata = await peek_book_metadata(book_in.isbn, db)
+    if metadata is None:
         raise HTTPException(status_code=404, detail="Book not found on Google Books")
 
-    new_book = Book(
-        title=metadata["title"],
-        author=metadata["author"],
-        isbn=book_in.isbn,
-        condition=book_in.condition,
-        image_url=metadata["image_url"],
-        owner_id=current_user.id,
-        status=BookStatus.AVAILABLE
-    )
+    if metadata is MISSING:
+        new_book = Book(
+            title=f"ISBN {book_in.isbn}",
+            author="",
+            isbn=normalize_isbn(book_in.isbn),
+            condition=book_in.condition,
+            owner_id=current_user.id,
+            status=BookStatus.PENDING_METADATA
+        )
+        enrichment.enqueue(db, new_book)
+    else:
+        new_book = Book(
+            title=metadata["title"],
+            author=metadata["author"],
+            isbn=normalize_isbn(book_in.isbn),
+            condition=book_in.condition,
+            image_url=metadata["image_url"],
+            owner_id=current_user.id,
+            status=BookStatus.AVAILABLE
+        )
     db.add(new_book)
+    await increment_books_listed(db, current_user.id)
     await db.commit()
     await db.refresh(new_book)
+    if new_book.status == BookStatus.PENDING_METADATA:
+        enrichment.enrichment_queue.notify()
+    else:
+        matching_engine.notify_isbn(new_book.isbn)
+        await notify_watchers([new_book])
     return new_book
 
+async def _owned_job(db: AsyncSession, book_id: int, user_id: int) -> MetadataJob:
+    result = await db.execute(
+        select(MetadataJob).where(MetadataJob.book_id == book_id).options(joinedload(MetadataJob.book))
+        .execution_options(populate_existing=True)
+    )
+    job = result.scalars().first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="No metadata lookup for this book")
+    if job.book.owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Not your book")
+    return job
+
+@router.get("/{book_id}/metadata", response_model=MetadataJobResponse)
+async def read_metadata_job(
+    book_id: int,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    wait: Annotated[float, Query(ge=0, le=30)] = 0,
+):
+    """
+    State of a book's background lookup. With wait > 0 this long-polls: it
+    answers as soon as the job finishes, or after `wait` seconds. A lookup
+    that finds nothing removes the book, after which this answers 404.
+    """
+    deadline = time.monotonic() + wait
+    user_id = current_user.id
+    job = await _owned_job(db, book_id, user_id)
+    while job.state not in enrichment.FINISHED_STATES and time.monotonic() < deadline:
+        # Give the connection back while waiting
+        await db.rollback()
+        await enrichment.enrichment_queue.wait_for(
+            book_id, min(deadline - time.monotonic(), settings.ENRICHMENT_POLL_SECONDS)
+        )
+        job = await _owned_job(db, book_id, user_id)
+    return job
+
+@router.post("/{book_id}/metadata/retry", response_model=MetadataJobResponse)
+async def retry_metadata_job(
+    book_id: int,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Puts a dead-lettered lookup (retries exhausted) back on the queue."""
+    job = await _owned_job(db, book_id, current_user.id)
+    if job.state != MetadataJobState.DEAD:
+        raise HTTPException(status_code=409, detail=f"Lookup is {job.state.value}, nothing to retry")
+    now = datetime.now(timezone.utc)
+    job.state = MetadataJobState.QUEUED
+    job.attempts = 0
+    job.next_attempt_at = now
+    job.updated_at = now
+    await db.commit()
+    enrichment.enrichment_queue.notify()
+    return job
+
+@router.post("/batch", response_model=BookBatchResponse)
+async def create_books_batch(
+    batch_in: BookBatchCreate,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Lists many books at once. Metadata for each distinct ISBN is resolved
+    once, with bounded parallelism; every entry gets its own result, and all
+    books are inserted with a single multi-row INSERT. Only ISBNs Google Books
+    reports as unknown fail; ones it could not answer for (errors, timeouts)
+    are listed as PENDING_METADATA and completed by the enrichment workers.
+    """
+    if not batch_in.items:
+        raise HTTPException(status_code=400, detail="No books in batch")
+    if len(batch_in.items) > settings.BOOK_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BOOK_BATCH_MAX_ITEMS} books per batch")
+
+    metadata = await get_book_metadata_many(
+        [item.isbn for item in batch_in.items], db, concurrency=settings.BOOK_BATCH_LOOKUP_CONCURRENCY
+    )
+
+    errors = []
+    created = []
+    for index, item in enumerate(batch_in.items):
+        found = metadata[normalize_isbn(item.isbn)]
+        if found is None:
+            errors.append(BookBatchItemResult(index=index, isbn=item.isbn, error="Book not found on Google Books"))
+            continue
+        if found is MISSING:
+            book = Book(
+                title=f"ISBN {item.isbn}",
+                author="",
+                isbn=normalize_isbn(item.isbn),
+                condition=item.condition,
+                owner_id=current_user.id,
+                status=BookStatus.PENDING_METADATA
+            )
+            enrichment.enqueue(db, book)
+            created.append((index, item.isbn, book))
+            continue
+        created.append((index, item.isbn, Book(
+            title=found["title"],
+            author=found["author"],
+            isbn=normalize_isbn(item.isbn),
+            condition=item.condition,
+            image_url=found["image_url"],
+            owner_id=current_user.id,
+            status=BookStatus.AVAILABLE
+        )))
+
+    if created:
+        db.add_all([book for _, _, book in created])
+        await increment_books_listed(db, current_user.id, len(created))
+        await db.commit()
+        listed = [book for _, _, book in created if book.status == BookStatus.AVAILABLE]
+        if len(listed) < len(created):
+            enrichment.enrichment_queue.notify()
+        for book in listed:
+            matching_engine.notify_isbn(book.isbn)
+        await notify_watchers(listed)
+
+    results = errors + [
+        BookBatchItemResult(index=index, isbn=isbn, book=BookResponse.model_validate(book))
+        for index, isbn, book in created
+    ]
+    results.sort(key=lambda result: result.index)
+    return BookBatchResponse(created=len(created), failed=len(errors), results=results)
+
+@router.get("/{book_id}/cover", response_class=FileResponse)
+async def read_cover(
+    book_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    if_none_match: Annotated[str | None, Header()] = None,
+    size: Literal["small", "medium", "large"] = "small",
+):
+    """
+    Fixed-size JPEG thumbnail of the book's cover. Thumbnails are content-
+    addressed, so the ETag is strong and clients may cache them for a long time.
+    """
+    image_url = await db.scalar(select(Book.image_url).where(Book.id == book_id))
+    if not image_url:
+        raise HTTPException(status_code=404, detail="Book has no cover")
+    try:
+        digest, path = await cover_cache.get(image_url, size)
+    except CoverUnavailable as exc:
+        raise HTTPException(status_code=502, detail=str(exc))
+
+    headers = {
+        "ETag": f'"{digest}"',
+        "Cache-Control": f"public, max-age={settings.COVER_CACHE_MAX_AGE_SECONDS}",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
+
+@router.get("/mine", response_model=List[BookResponse])
+async def read_my_books(
+    response: Response,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    book_status: Annotated[BookStatus | None, Query(alias="status")] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    The current user's own books in every status (or just one), served from
+    the (owner_id, status) index and keyset-paginated on id. ETag-tagged;
+    an unchanged page answers If-None-Match with 304.
+    """
+    query = select(*_book_columns).where(Book.owner_id == current_user.id)
+    if book_status is not None:
+        query = query.where(Book.status == book_status)
+    if cursor:
+        query = query.where(Book.id > decode_cursor_fields(cursor, id=int)[0])
+
+    result = await db.execute(query.order_by(Book.id).limit(limit + 1))
+    books = [dict(row) for row in result.mappings()]
+    if len(books) > limit:
+        books = books[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": books[-1]["id"]})
+    return conditional_json(_book_list, books, if_none_match, response)
+
+@router.get("/search", response_model=List[BookResponse])
+async def search_catalogue(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+):
+    return await search_books(db, q.strip(), limit)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_books(after_id: int | None = None):
+    """
+    The whole AVAILABLE catalogue as NDJSON, one BookResponse object per line
+    in id order. Rows come off a server-side cursor BOOK_EXPORT_BATCH_SIZE at
+    a time and are sent as they arrive, so memory stays flat however large
+    the catalogue is. An interrupted sync resumes with after_id set to the
+    last id received.
+    """
+    query = select(*_book_columns).where(Book.status == BookStatus.AVAILABLE)
+    if after_id is not None:
+        query = query.where(Book.id > after_id)
+    query = query.order_by(Book.id).execution_options(yield_per=settings.BOOK_EXPORT_BATCH_SIZE)
+
+    async def lines():
+        # Its own session: the stream outlives the request's dependencies
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for rows in result.mappings().partitions():
+                yield b"".join(_book.dump_json(_book.validate_python(dict(row))) + b"\n" for row in rows)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 @router.get("/", response_model=List[BookResponse])
 async def read_books(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
-    skip: int = 0,
-    limit: int = 100
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    order_by: Literal["id", "title"] = "id",
+    book_status: Annotated[BookStatus, Query(alias="status")] = BookStatus.AVAILABLE,
+    owner_id: int | None = None,
+    exclude_owner_id: int | None = None,
+    author: str | None = None,
+    title_prefix: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    result = await db.execute(select(Book).where(Book.status == BookStatus.AVAILABLE).offset(skip).limit(limit))
-    return result.scalars().all()
+    """
+    Keyset-paginated catalogue listing. When more rows exist, the opaque
+    cursor for the next page is returned in the X-Next-Cursor header.
+    Pages carry an ETag and are revalidated with If-None-Match (304).
+    """
+    query = select(*_book_columns).where(Book.status == book_status)
+    if owner_id is not None:
+        query = query.where(Book.owner_id == owner_id)
+    if exclude_owner_id is not None:
+        query = query.where(Book.owner_id != exclude_owner_id)
+    if author:
+        query = query.where(Book.author.ilike(f"%{_escape_like(author)}%", escape="\\"))
+    if title_prefix:
+        query = query.where(Book.title.startswith(title_prefix, autoescape=True))
+
+    if order_by == "title":
+        if cursor:
+            query = query.where(tuple_(Book.title, Book.id) > tuple_(*decode_cursor_fields(cursor, title=str, id=int)))
+        query = query.order_by(Book.title, Book.id)
+    else:
+        if cursor:
+            query = query.where(Book.id > decode_cursor_fields(cursor, id=int)[0])
+        query = query.order_by(Book.id)
+
+    result = await db.execute(query.limit(limit + 1))
+    books = [dict(row) for row in result.mappings()]
+    if len(books) > limit:
+        books = books[:limit]
+        last = books[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            {"id": last["id"], "title": last["title"]} if order_by == "title" else {"id": last["id"]}
+        )
+    return conditional_json(_book_list, books, if_none_match, response)
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from typing import Annotated
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.api.deps import Principal, get_current_user
+from app.services.events import event_bus
+
+router = APIRouter(tags=["events"])
+
+def _format(event: dict) -> str:
+    lines = [f"event: {event['type']}", f"data: {json.dumps(event['data'], separators=(',', ':'))}"]
+    if event["id"] is not None:
+        lines.insert(0, f"id: {event['id']}")
+    return "\n".join(lines) + "\n\n"
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Server-Sent Events stream of the current user's swap updates. Each
+    `transaction` event carries the transaction as returned by the swap
+    endpoints, and each `watch` event a new listing matching the user's
+    watches. A `resync` event means events were dropped and the client
+    should reload. A comment line is sent every EVENTS_HEARTBEAT_SECONDS so
+    idle connections stay open and dead ones are noticed.
+    """
+    user_id = current_user.id
+    # The stream can stay open for hours; don't hold a pooled connection for it
+    await db.close()
+
+    async def events():
+        with event_bus.subscribe(user_id) as subscription:
+            yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await subscription.get(settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield _format(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,172 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from sqlalchemy import select, tuple_, union_all
+from pydantic import TypeAdapter
 from typing import Annotated, List
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.conditional import conditional_json
+from app.api.deps import Principal, get_current_user
+from app.api.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor_fields
 from app.models.user import User
-from app.models.book import Book, BookStatus
+from app.models.book import Book
 from app.models.transaction import Transaction, TransactionStatus
-from app.schemas.transaction import TransactionCreate, TransactionResponse, TransactionUpdate
+from app.schemas.transaction import TransactionCreate, TransactionResponse, TransactionUpdate, SwapBookSummary, SwapDetailResponse
+from app.services import swaps
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
+_swap_list = TypeAdapter(List[SwapDetailResponse])
+
+# my-swaps reads plain rows: the transaction's own columns, then each side's book and username under a prefix
+_tx_fields = list(TransactionResponse.model_fields)
+_summary_fields = list(SwapBookSummary.model_fields)
+_book, _offered_book = aliased(Book), aliased(Book)
+_giver, _receiver = aliased(User), aliased(User)
+_swap_columns = [
+    *(getattr(Transaction, name) for name in _tx_fields),
+    *(getattr(_book, name).label(f"book_{name}") for name in _summary_fields),
+    *(getattr(_offered_book, name).label(f"offered_book_{name}") for name in _summary_fields),
+    _giver.username.label("giver_username"),
+    _receiver.username.label("receiver_username"),
+]
+
 @router.post("/request", response_model=TransactionResponse)
 async def request_book(
     tx_in: TransactionCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    # 1. Fetch the target book
-    result = await db.execute(select(Book).where(Book.id == tx_in.book_id))
-    book = result.scalars().first()
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-
-    # 2. Validation
-    if book.owner_id == current_user.id:
-        raise HTTPException(status_code=400, detail="Cannot request your own book")
-    if book.status != BookStatus.AVAILABLE:
-        raise HTTPException(status_code=400, detail="Book is not available")
-
-    # 3. Barter Logic vs Points Logic
-    offered_book = None
-    if tx_in.offered_book_id:
-        # Fetch offered book
-        res_offered = await db.execute(select(Book).where(Book.id == tx_in.offered_book_id))
-        offered_book = res_offered.scalars().first()
-
-        if not offered_book:
-             raise HTTPException(status_code=404, detail="Offered book not found")
-        if offered_book.owner_id != current_user.id:
-             raise HTTPException(status_code=403, detail="You do not own the offered book")
-        if offered_book.status != BookStatus.AVAILABLE:
-             raise HTTPException(status_code=400, detail="Offered book is not available")
-
-        # Mark offered book pending
-        offered_book.status = BookStatus.PENDING
-
-    else:
-        # Point System Fallback (if no book offered)
-        if current_user.points < 1:
-            raise HTTPException(status_code=400, detail="Insufficient points. Offer a book or earn points.")
-        current_user.points -= 1
+    return await swaps.request_book(db, current_user.id, tx_in.book_id, tx_in.offered_book_id)
 
-    # Update target book status
-    book.status = BookStatus.PENDING
-
-    # Create Transaction
-    new_tx = Transaction(
-        book_id=book.id,
-        offered_book_id=offered_book.id if offered_book else None,
-        giver_id=book.owner_id,
-        receiver_id=current_user.id,
-        status=TransactionStatus.REQUESTED
-    )
-
-    db.add(new_tx)
-    await db.commit()
-    await db.refresh(new_tx)
-    return new_tx
-
-@router.get("/my-swaps", response_model=List[TransactionResponse])
+@router.get("/my-swaps", response_model=List[SwapDetailResponse])
 async def get_my_swaps(
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    response: Response,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 100,
+    tx_status: Annotated[List[TransactionStatus] | None, Query(alias="status")] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    # Fetch transactions where user is giver OR receiver
+    """
+    The user's transactions, newest first, with both books and both usernames
+    expanded. Keyset-paginated on (created_at, id) via the X-Next-Cursor header.
+    ETag-tagged, so an unchanged page revalidates with a 304.
+    """
+    after = decode_cursor_fields(cursor, created_at=datetime.fromisoformat, id=int) if cursor else None
+
+    # One index range scan per side ((giver_id, created_at) and (receiver_id, created_at))
+    # instead of an OR that can't use either index
+    def side(column):
+        query = select(Transaction.id, Transaction.created_at).where(column == current_user.id)
+        if tx_status:
+            query = query.where(Transaction.status.in_(tx_status))
+        if after:
+            query = query.where(tuple_(Transaction.created_at, Transaction.id) < tuple_(*after))
+        query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit + 1)
+        return select(query.subquery())
+
+    page = union_all(side(Transaction.giver_id), side(Transaction.receiver_id)).subquery()
     result = await db.execute(
-        select(Transaction)
-        .where((Transaction.giver_id == current_user.id) | (Transaction.receiver_id == current_user.id))
-        .order_by(Transaction.created_at.desc())
+        select(*_swap_columns)
+        .join(page, Transaction.id == page.c.id)
+        .join(_book, _book.id == Transaction.book_id)
+        .outerjoin(_offered_book, _offered_book.id == Transaction.offered_book_id)
+        .join(_giver, _giver.id == Transaction.giver_id)
+        .join(_receiver, _receiver.id == Transaction.receiver_id)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(limit + 1)
     )
-    return result.scalars().all()
+    rows = result.mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            {"created_at": rows[-1]["created_at"].isoformat(), "id": rows[-1]["id"]}
+        )
+
+    # Plain dicts, validated and serialized once by _swap_list
+    user_id = current_user.id
+    return conditional_json(_swap_list, [
+        {
+            **{name: row[name] for name in _tx_fields},
+            "book": {name: row[f"book_{name}"] for name in _summary_fields},
+            "offered_book": (
+                {name: row[f"offered_book_{name}"] for name in _summary_fields}
+                if row["offered_book_id"] is not None else None
+            ),
+            "giver_username": row["giver_username"],
+            "receiver_username": row["receiver_username"],
+            "counterparty_username": row["receiver_username"] if row["giver_id"] == user_id else row["giver_username"],
+        }
+        for row in rows
+    ], if_none_match, response)
 
 @router.put("/{tx_id}/accept", response_model=TransactionResponse)
 async def accept_request(
     tx_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    result = await db.execute(select(Transaction).where(Transaction.id == tx_id))
-    tx = result.scalars().first()
-    if not tx:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-
-    if tx.giver_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to accept this request")
-
-    if tx.status != TransactionStatus.REQUESTED:
-        raise HTTPException(status_code=400, detail="Transaction must be in REQUESTED state")
-
-    tx.status = TransactionStatus.ACCEPTED
-    await db.commit()
-    await db.refresh(tx)
-    return tx
+    return await swaps.accept_request(db, current_user.id, tx_id)
 
 @router.put("/{tx_id}/ship", response_model=TransactionResponse)
 async def ship_book(
     tx_id: int,
     payload: TransactionUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    result = await db.execute(select(Transaction).where(Transaction.id == tx_id))
-    tx = result.scalars().first()
-    if not tx:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-
-    if tx.giver_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to ship this book")
-
-    if tx.status != TransactionStatus.ACCEPTED:
-        raise HTTPException(status_code=400, detail="Transaction must be ACCEPTED before shipping")
-
-    if not payload.tracking_number:
-         raise HTTPException(status_code=400, detail="Tracking number required")
-
-    tx.status = TransactionStatus.SHIPPED
-    tx.tracking_number = payload.tracking_number
-    await db.commit()
-    await db.refresh(tx)
-    return tx
+    return await swaps.ship_book(db, current_user.id, tx_id, payload.tracking_number)
 
 @router.put("/{tx_id}/confirm", response_model=TransactionResponse)
 async def confirm_receipt(
     tx_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    # Eager load giver and book because we need to update them
-    # Actually explicit queries might be safer/clearer for updates
-    result = await db.execute(select(Transaction).where(Transaction.id == tx_id))
-    tx = result.scalars().first()
-    if not tx:
-         raise HTTPException(status_code=404, detail="Transaction not found")
-
-    if tx.receiver_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to confirm this receipt")
-
-    if tx.status != TransactionStatus.SHIPPED:
-        raise HTTPException(status_code=400, detail="Transaction must be SHIPPED before confirming")
-
-    # Logic:
-    # 1. Update Tx -> COMPLETED
-    tx.status = TransactionStatus.COMPLETED
-
-    # 2. Update Book -> SWAPPED (so it doesn't show as pending forever, though technically it's gone)
-    book_result = await db.execute(select(Book).where(Book.id == tx.book_id))
-    book = book_result.scalars().first()
-    if book:
-        book.status = BookStatus.SWAPPED
-
-    # 3. Add Point to Giver
-    giver_result = await db.execute(select(User).where(User.id == tx.giver_id))
-    giver = giver_result.scalars().first()
-    if giver:
-        giver.points += 1
-
-    await db.commit()
-    await db.refresh(tx)
-    return tx
+    return await swaps.confirm_receipt(db, current_user.id, tx_id)
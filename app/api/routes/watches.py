@@ -0,0 +1,58 @@
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+
+from app.core.database import get_db
+from app.api.deps import Principal, get_current_user
+from app.models.watch import Watch
+from app.schemas.watch import WatchCreate, WatchResponse
+from app.services.watches import normalize_value, bump_version
+
+router = APIRouter(prefix="/watches", tags=["watches"])
+
+@router.get("/", response_model=List[WatchResponse])
+async def read_my_watches(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    result = await db.execute(select(Watch).where(Watch.user_id == current_user.id).order_by(Watch.created_at))
+    return result.scalars().all()
+
+@router.post("/", response_model=WatchResponse)
+async def add_watch(
+    watch_in: WatchCreate,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Watches for new listings by ISBN, or by every word of an author or title
+    (case and accents ignored). Matching listings by other users trigger a
+    `watch` event on GET /events. Adding the same watch twice returns the
+    existing one.
+    """
+    value = normalize_value(watch_in.kind, watch_in.value)
+    if not value:
+        raise HTTPException(status_code=400, detail="Nothing to watch for")
+    user_id = current_user.id
+    watch = (await db.execute(
+        select(Watch).where(Watch.user_id == user_id, Watch.kind == watch_in.kind, Watch.value == value)
+    )).scalars().first()
+    if watch is None:
+        watch = Watch(user_id=user_id, kind=watch_in.kind, value=value, version=await bump_version(db))
+        db.add(watch)
+        await db.commit()
+        await db.refresh(watch)
+    return watch
+
+@router.delete("/{watch_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_watch(
+    watch_id: int,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    result = await db.execute(delete(Watch).where(Watch.id == watch_id, Watch.user_id == current_user.id).returning(Watch.id))
+    if result.first() is not None:
+        await bump_version(db, removal=True)
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
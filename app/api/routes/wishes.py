@@ -0,0 +1,55 @@
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+
+from app.core.database import get_db
+from app.api.deps import Principal, get_current_user
+from app.models.wish import Wish
+from app.schemas.wish import WishCreate, WishResponse
+from app.services.book_metadata import normalize_isbn
+from app.services.matching import matching_engine
+
+router = APIRouter(prefix="/wishes", tags=["wishes"])
+
+@router.get("/", response_model=List[WishResponse])
+async def read_my_wishes(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    result = await db.execute(select(Wish).where(Wish.user_id == current_user.id).order_by(Wish.created_at))
+    return result.scalars().all()
+
+@router.post("/", response_model=WishResponse)
+async def add_wish(
+    wish_in: WishCreate,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Adds an ISBN to the wishlist. The matching engine then looks for a trade
+    cycle that gets it to you; a match shows up as a REQUESTED swap with a
+    cycle_id. Adding an ISBN twice returns the existing wish.
+    """
+    isbn = normalize_isbn(wish_in.isbn)
+    if not isbn:
+        raise HTTPException(status_code=400, detail="ISBN required")
+    user_id = current_user.id
+    wish = (await db.execute(select(Wish).where(Wish.user_id == user_id, Wish.isbn == isbn))).scalars().first()
+    if wish is None:
+        wish = Wish(user_id=user_id, isbn=isbn)
+        db.add(wish)
+        await db.commit()
+        await db.refresh(wish)
+        matching_engine.notify_users([user_id])
+    return wish
+
+@router.delete("/{isbn}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_wish(
+    isbn: str,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    await db.execute(delete(Wish).where(Wish.user_id == current_user.id, Wish.isbn == normalize_isbn(isbn)))
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
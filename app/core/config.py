@@ -1,8 +1,43 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import PostgresDsn
 
+# Engine defaults per environment; any DB_* setting left unset falls back to these
+DB_PRESETS = {
+    "dev": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_recycle": -1,
+        "pool_pre_ping": True,
+        "pool_timeout": 30.0,
+        "statement_cache_size": 100,
+        "echo": True,
+    },
+    "prod": {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "pool_timeout": 10.0,
+        "statement_cache_size": 500,
+        "echo": False,
+    },
+}
+
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ENVIRONMENT: Literal["dev", "prod"] = "prod"
+
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_RECYCLE: int | None = None
+    DB_POOL_PRE_PING: bool | None = None
+    DB_POOL_TIMEOUT: float | None = None
+    DB_STATEMENT_CACHE_SIZE: int | None = None
+    DB_ECHO: bool | None = None
+    # Total connections the database allows us; split evenly across workers when set
+    DB_MAX_CONNECTIONS: int | None = None
+    WEB_CONCURRENCY: int = 1
 
     model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True, extra="ignore")
 
@@ -23,8 +58,91 @@ class Settings(BaseSettings):
                  url = url[:-1]
         return url
 
+    @property
+    def DB_ENGINE_OPTIONS(self) -> dict:
+        options = dict(DB_PRESETS[self.ENVIRONMENT])
+        overrides = {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "statement_cache_size": self.DB_STATEMENT_CACHE_SIZE,
+            "echo": self.DB_ECHO,
+        }
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        if self.DB_MAX_CONNECTIONS and self.DB_POOL_SIZE is None and self.DB_MAX_OVERFLOW is None:
+            per_worker = max(1, self.DB_MAX_CONNECTIONS // max(1, self.WEB_CONCURRENCY))
+            options["pool_size"] = max(1, per_worker * 2 // 3)
+            options["max_overflow"] = per_worker - options["pool_size"]
+        return options
+
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+
+    # Password hashing runs on a bounded worker pool (see app.core.security)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    GOOGLE_BOOKS_API_URL: str = "https://www.googleapis.com/books/v1/volumes"
+    ISBN_CACHE_SIZE: int = 10_000
+    ISBN_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    ISBN_NEGATIVE_CACHE_TTL_SECONDS: int = 60 * 60
+    BOOK_BATCH_MAX_ITEMS: int = 100
+    BOOK_BATCH_LOOKUP_CONCURRENCY: int = 8
+
+    # Background metadata lookups for PENDING_METADATA books (see app.services.enrichment)
+    ENRICHMENT_WORKERS: int = 2
+    ENRICHMENT_RATE_PER_SECOND: float = 5.0 # Google Books calls per process; 0 disables the limit
+    ENRICHMENT_BURST: int = 5
+    ENRICHMENT_MAX_ATTEMPTS: int = 6
+    ENRICHMENT_RETRY_BASE_SECONDS: float = 5.0
+    ENRICHMENT_RETRY_MAX_SECONDS: float = 15 * 60
+    ENRICHMENT_LEASE_SECONDS: int = 120
+    ENRICHMENT_POLL_SECONDS: float = 5.0
+
+    # Cover thumbnails served by GET /books/{id}/cover (see app.services.covers)
+    COVER_CACHE_DIR: str = ".cache/covers"
+    COVER_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    COVER_CACHE_MAX_AGE_SECONDS: int = 30 * 24 * 60 * 60
+    COVER_MAX_SOURCE_BYTES: int = 5 * 1024 * 1024
+    COVER_JPEG_QUALITY: int = 85
+
+    # Multi-party swap cycles found from wishlists (see app.services.matching)
+    MATCHING_MAX_CYCLE_LENGTH: int = 4
+    MATCHING_MAX_FRONTIER: int = 2000 # Users expanded per search level
+    MATCHING_MAX_EDGES: int = 20_000 # Want-graph edges read per search level
+    MATCHING_MAX_SEEDS_PER_ISBN: int = 500 # Wishers searched when a copy is listed
+    MATCHING_MAX_CYCLES_PER_SEED: int = 5
+
+    # Server-Sent Events stream at GET /events (see app.services.events)
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_RETRY_MS: int = 3000
+
+    # Response compression (see app.core.compression)
+    COMPRESSION_MINIMUM_SIZE: int = 1024 # Smaller bodies are sent as they are
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI: bool = True # Only used when the brotli package is installed
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # GET /books/export
+    BOOK_EXPORT_BATCH_SIZE: int = 1000 # Rows fetched from the cursor per round trip
+
+    # Shared outbound HTTP client (see app.core.http)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CLIENT_MAX_PER_HOST: int = 10
+    HTTP_CLIENT_HTTP2: bool = True
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 3.0
+    HTTP_CLIENT_READ_TIMEOUT: float = 5.0
+    HTTP_CLIENT_RETRIES: int = 2
+    HTTP_CLIENT_RETRY_BACKOFF: float = 0.25
+
 settings = Settings()
@@ -1,8 +1,44 @@
+import time
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=True)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    checkouts = 0
+    wait_seconds_total = 0.0
+    wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+def _engine_kwargs(url: str) -> dict:
+    options = settings.DB_ENGINE_OPTIONS
+    kwargs = {"echo": options["echo"], "pool_pre_ping": options["pool_pre_ping"]}
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool class; sizing options don't apply
+        return kwargs
+    kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=options["pool_size"],
+        max_overflow=options["max_overflow"],
+        pool_recycle=options["pool_recycle"],
+        pool_timeout=options["pool_timeout"],
+    )
+    if "+asyncpg" in url:
+        kwargs["connect_args"] = {"statement_cache_size": options["statement_cache_size"]}
+    return kwargs
+
+engine = create_async_engine(settings.ASYNC_DATABASE_URL, **_engine_kwargs(settings.ASYNC_DATABASE_URL))
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -16,3 +52,18 @@ class Base(DeclarativeBase):
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    stats = {"status": pool.status()}
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            checkouts=pool.checkouts,
+            wait_seconds_avg=pool.wait_seconds_total / pool.checkouts if pool.checkouts else 0.0,
+            wait_seconds_max=pool.wait_seconds_max,
+        )
+    return stats
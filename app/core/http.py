@@ -0,0 +1,96 @@
+import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+import httpx
+from app.core.config import settings
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class OutboundClient:
+    """
+    App-wide pooled httpx client for calls to external services.
+    Opened and closed by the FastAPI lifespan; requests to a single host are
+    capped by a semaphore and idempotent calls are retried with backoff.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    def _build(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=settings.HTTP_CLIENT_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_CLIENT_READ_TIMEOUT,
+                connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+            ),
+            follow_redirects=True,
+        )
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = self._build()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_limits.clear()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Scripts that never run the lifespan still get a working client
+        if self._client is None:
+            self._client = self._build()
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(settings.HTTP_CLIENT_MAX_PER_HOST)
+        return self._host_limits[host]
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        async with self.stream(url, **kwargs) as response:
+            await response.aread()
+        return response
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs):
+        """
+        GET that yields the response before its body is read, so callers can
+        cap how much of it they download. Retried like get() until then.
+        """
+        attempts = settings.HTTP_CLIENT_RETRIES + 1
+        async with self._host_limit(url):
+            for attempt in range(attempts):
+                last_try = attempt == attempts - 1
+                try:
+                    response = await self.client.send(self.client.build_request("GET", url, **kwargs), stream=True)
+                except httpx.TransportError:
+                    if last_try:
+                        raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or last_try:
+                        try:
+                            yield response
+                        finally:
+                            await response.aclose()
+                        return
+                    await response.aclose()
+                await asyncio.sleep(settings.HTTP_CLIENT_RETRY_BACKOFF * (2 ** attempt))
+        raise RuntimeError("unreachable")
+
+http_client = OutboundClient()
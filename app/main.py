@@ -1,21 +1,69 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from app.core.database import engine, Base
+from typing import Annotated
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.compression import CompressionMiddleware
+from app.core.database import engine, get_db, pool_stats
+from app.migrations import ensure_schema_current
+from app.core.http import http_client
+from app.core.security import PasswordHasherBusy
+from app.services.swaps import SwapError
 from app.models import User, Book, Transaction
-from app.api.routes import auth, transactions, books
+from app.api.routes import auth, transactions, books, events, wishes, watches
+from app.services import book_metadata, covers, enrichment, matching
+from app.services.events import event_bus
+from app.services.watches import watch_index
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
+    # Schema changes are applied by `python migrate.py upgrade`, not at boot
+    await ensure_schema_current(engine)
+    await http_client.start()
+    await enrichment.enrichment_queue.start()
+    await matching.matching_engine.start()
+    try:
+        yield
+    finally:
+        event_bus.close()
+        await matching.matching_engine.stop()
+        await enrichment.enrichment_queue.stop()
+        await http_client.aclose()
 
 app = FastAPI(title="BookLoop API", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(SwapError)
+async def swap_error_handler(request: Request, exc: SwapError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 app.include_router(auth.router)
 app.include_router(transactions.router)
 app.include_router(books.router)
+app.include_router(wishes.router)
+app.include_router(watches.router)
+app.include_router(events.router)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to BookLoop API", "status": "active"}
+
+@app.get("/metrics")
+async def metrics(db: Annotated[AsyncSession, Depends(get_db)]):
+    return {
+        "isbn_cache": book_metadata.cache_stats(),
+        "db_pool": pool_stats(),
+        "covers": covers.cover_cache.snapshot(),
+        "enrichment": {**enrichment.enrichment_queue.snapshot(), "jobs": await enrichment.backlog(db)},
+        "matching": matching.matching_engine.snapshot(),
+        "events": event_bus.snapshot(),
+        "watches": watch_index.snapshot(),
+    }
@@ -0,0 +1,86 @@
+"""
+Versioned schema migrations.
+
+Each module in MIGRATIONS exposes VERSION, DESCRIPTION and a synchronous
+upgrade(conn) that receives a SQLAlchemy Connection (run through run_sync).
+Applied versions are recorded in the schema_version table; every migration
+runs in its own transaction together with its version row.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Table, Column, Integer, String, DateTime, MetaData, select, func, insert, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.migrations import (
+    v0001_baseline, v0002_performance_indexes, v0003_metadata_jobs, v0004_wishes_and_cycles, v0005_watches,
+    v0006_watch_index_state,
+)
+
+MIGRATIONS = [
+    v0001_baseline,
+    v0002_performance_indexes,
+    v0003_metadata_jobs,
+    v0004_wishes_and_cycles,
+    v0005_watches,
+    v0006_watch_index_state,
+]
+
+HEAD = MIGRATIONS[-1].VERSION
+
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+def current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table("schema_version"):
+        # Databases created by the old create_all-at-startup code already hold the baseline
+        return v0001_baseline.VERSION if inspect(conn).has_table("users") else 0
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def _record(conn: Connection, migration) -> None:
+    _metadata.create_all(conn, tables=[schema_version])
+    conn.execute(insert(schema_version).values(
+        version=migration.VERSION,
+        description=migration.DESCRIPTION,
+        applied_at=datetime.now(timezone.utc),
+    ))
+
+async def upgrade(engine: AsyncEngine, target: int = HEAD, log=print) -> int:
+    async with engine.connect() as conn:
+        version = await conn.run_sync(current_version)
+    for migration in MIGRATIONS:
+        if version < migration.VERSION <= target:
+            log(f"Applying {migration.VERSION:04d}: {migration.DESCRIPTION}")
+            async with engine.begin() as conn:
+                if version and not await conn.run_sync(lambda c: inspect(c).has_table("schema_version")):
+                    # Record the implicit baseline of a pre-migrations database first
+                    await conn.run_sync(_record, v0001_baseline)
+                await conn.run_sync(migration.upgrade)
+                await conn.run_sync(_record, migration)
+            version = migration.VERSION
+    return version
+
+async def stamp(engine: AsyncEngine, target: int = HEAD) -> None:
+    """Marks migrations up to target as applied without running them."""
+    async with engine.begin() as conn:
+        version = await conn.run_sync(current_version)
+        for migration in MIGRATIONS:
+            if version < migration.VERSION <= target:
+                await conn.run_sync(_record, migration)
+
+async def ensure_schema_current(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        version = await conn.run_sync(current_version)
+    if version != HEAD:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, this build expects {HEAD}. "
+            "Run `python migrate.py upgrade`."
+        )
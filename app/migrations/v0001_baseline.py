@@ -0,0 +1,54 @@
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Boolean, DateTime, Enum, ForeignKey,
+)
+from sqlalchemy.engine import Connection
+
+VERSION = 1
+DESCRIPTION = "Baseline: users, books, transactions"
+
+# Frozen copy of the schema that create_all produced before migrations existed
+metadata = MetaData()
+
+Table(
+    "users",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String, unique=True, index=True, nullable=False),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("password_hash", String, nullable=False),
+    Column("is_kyc_verified", Boolean, nullable=False),
+    Column("points", Integer, nullable=False),
+)
+
+Table(
+    "books",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String, index=True, nullable=False),
+    Column("author", String, index=True, nullable=False),
+    Column("isbn", String, index=True, nullable=True),
+    Column("condition", String, nullable=True),
+    Column("image_url", String, nullable=True),
+    Column("owner_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("status", Enum("AVAILABLE", "PENDING", "SWAPPED", name="bookstatus"), nullable=False),
+)
+
+Table(
+    "transactions",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("book_id", Integer, ForeignKey("books.id"), nullable=False),
+    Column("offered_book_id", Integer, ForeignKey("books.id"), nullable=True),
+    Column("giver_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("receiver_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column(
+        "status",
+        Enum("REQUESTED", "ACCEPTED", "SHIPPED", "COMPLETED", name="transactionstatus"),
+        nullable=False,
+    ),
+    Column("tracking_number", String, nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+)
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn)
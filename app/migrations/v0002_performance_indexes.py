@@ -0,0 +1,66 @@
+from sqlalchemy import MetaData, Table, Column, String, Boolean, DateTime, text, inspect
+from sqlalchemy.engine import Connection
+
+VERSION = 2
+DESCRIPTION = "ISBN metadata cache, user stat counters, listing/search/swap indexes"
+
+metadata = MetaData()
+
+isbn_metadata = Table(
+    "isbn_metadata",
+    metadata,
+    Column("isbn", String, primary_key=True),
+    Column("found", Boolean, nullable=False),
+    Column("title", String, nullable=True),
+    Column("author", String, nullable=True),
+    Column("image_url", String, nullable=True),
+    Column("fetched_at", DateTime(timezone=True), nullable=False),
+)
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_books_owner_id_status ON books (owner_id, status)",
+    # Marketplace listing only ever pages through AVAILABLE books
+    "CREATE INDEX IF NOT EXISTS ix_books_available_id ON books (id) WHERE status = 'AVAILABLE'",
+    "CREATE INDEX IF NOT EXISTS ix_books_available_title_id ON books (title, id) WHERE status = 'AVAILABLE'",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_giver_id_created_at ON transactions (giver_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_receiver_id_created_at ON transactions (receiver_id, created_at)",
+]
+
+SEARCH_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_books_search_tsv ON books USING GIN "
+        "(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '')))",
+        "CREATE INDEX IF NOT EXISTS ix_books_title_trgm ON books USING GIN (title gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_books_author_trgm ON books USING GIN (author gin_trgm_ops)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+        "title, author, isbn, content='books', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN "
+        "INSERT INTO books_fts(rowid, title, author, isbn) VALUES (new.id, new.title, new.author, new.isbn); END",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN "
+        "INSERT INTO books_fts(books_fts, rowid, title, author, isbn) VALUES ('delete', old.id, old.title, old.author, old.isbn); END",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, author, isbn ON books BEGIN "
+        "INSERT INTO books_fts(books_fts, rowid, title, author, isbn) VALUES ('delete', old.id, old.title, old.author, old.isbn); "
+        "INSERT INTO books_fts(rowid, title, author, isbn) VALUES (new.id, new.title, new.author, new.isbn); END",
+        "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+    ],
+}
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn)
+
+    user_columns = {column["name"] for column in inspect(conn).get_columns("users")}
+    for column in ("books_listed", "books_swapped"):
+        if column not in user_columns:
+            conn.execute(text(f"ALTER TABLE users ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text(
+        "UPDATE users SET "
+        "books_listed = (SELECT count(*) FROM books WHERE books.owner_id = users.id), "
+        "books_swapped = (SELECT count(*) FROM transactions WHERE transactions.receiver_id = users.id "
+        "AND transactions.status = 'COMPLETED')"
+    ))
+
+    for statement in INDEXES + SEARCH_DDL.get(conn.dialect.name, []):
+        conn.execute(text(statement))
@@ -0,0 +1,35 @@
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, Enum, ForeignKey, Index, text
+from sqlalchemy.engine import Connection
+
+VERSION = 3
+DESCRIPTION = "PENDING_METADATA book status and the metadata_jobs queue"
+
+metadata = MetaData()
+
+# Only what the foreign key needs to resolve; the real table comes from 0001
+Table("books", metadata, Column("id", Integer, primary_key=True))
+
+metadata_jobs = Table(
+    "metadata_jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("book_id", Integer, ForeignKey("books.id"), nullable=False, unique=True),
+    Column("isbn", String, nullable=False),
+    Column(
+        "state",
+        Enum("QUEUED", "RUNNING", "DONE", "NOT_FOUND", "DEAD", name="metadatajobstate"),
+        nullable=False,
+    ),
+    Column("attempts", Integer, nullable=False),
+    Column("next_attempt_at", DateTime(timezone=True), nullable=False),
+    Column("last_error", String, nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Index("ix_metadata_jobs_state_next_attempt_at", "state", "next_attempt_at"),
+)
+
+def upgrade(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        # Allowed inside a transaction since PostgreSQL 12, as long as nothing here uses the value
+        conn.execute(text("ALTER TYPE bookstatus ADD VALUE IF NOT EXISTS 'PENDING_METADATA'"))
+    metadata.create_all(conn, tables=[metadata_jobs])
@@ -0,0 +1,40 @@
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.engine import Connection
+
+VERSION = 4
+DESCRIPTION = "Wishlists and multi-party swap cycles"
+
+metadata = MetaData()
+
+# Only what the foreign keys need to resolve; the real tables come from 0001
+Table("users", metadata, Column("id", Integer, primary_key=True))
+
+wishes = Table(
+    "wishes",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("isbn", String, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    UniqueConstraint("user_id", "isbn", name="uq_wishes_user_id_isbn"),
+    Index("ix_wishes_user_id", "user_id"),
+    Index("ix_wishes_isbn", "isbn"),
+)
+
+swap_cycles = Table(
+    "swap_cycles",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("size", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+)
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, tables=[wishes, swap_cycles])
+    # SQLite can add a column with an inline REFERENCES clause, but not a named constraint
+    conn.execute(text("ALTER TABLE transactions ADD COLUMN cycle_id INTEGER REFERENCES swap_cycles (id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_transactions_cycle_id ON transactions (cycle_id)"))
+    # Wishes match books on normalized ISBNs (book_metadata.normalize_isbn)
+    conn.execute(text("UPDATE books SET isbn = upper(trim(replace(replace(isbn, '-', ''), ' ', ''))) WHERE isbn IS NOT NULL"))
+    # Edges of the want-graph are found by joining wishes to AVAILABLE books on isbn
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_books_available_isbn ON books (isbn) WHERE status = 'AVAILABLE'"))
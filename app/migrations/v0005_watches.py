@@ -0,0 +1,28 @@
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, Enum, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.engine import Connection
+
+VERSION = 5
+DESCRIPTION = "ISBN, author and title watches"
+
+metadata = MetaData()
+
+# Only what the foreign keys need to resolve; the real tables come from 0001
+Table("users", metadata, Column("id", Integer, primary_key=True))
+Table("books", metadata, Column("id", Integer, primary_key=True))
+
+watches = Table(
+    "watches",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("kind", Enum("ISBN", "AUTHOR", "TITLE", name="watchkind"), nullable=False),
+    Column("value", String, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("last_matched_book_id", Integer, ForeignKey("books.id"), nullable=True),
+    Column("last_matched_at", DateTime(timezone=True), nullable=True),
+    UniqueConstraint("user_id", "kind", "value", name="uq_watches_user_id_kind_value"),
+    Index("ix_watches_user_id", "user_id"),
+)
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, tables=[watches])
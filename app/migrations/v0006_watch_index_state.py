@@ -0,0 +1,21 @@
+from sqlalchemy import MetaData, Table, Column, Integer, insert, text
+from sqlalchemy.engine import Connection
+
+VERSION = 6
+DESCRIPTION = "Version counter for the in-memory watch indexes"
+
+metadata = MetaData()
+
+watch_index_state = Table(
+    "watch_index_state",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("reset_version", Integer, nullable=False),
+)
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, tables=[watch_index_state])
+    conn.execute(insert(watch_index_state).values(id=1, version=0, reset_version=0))
+    conn.execute(text("ALTER TABLE watches ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_watches_version ON watches (version)"))
@@ -1,3 +1,7 @@
 from .user import User
 from .book import Book, BookStatus
 from .transaction import Transaction, TransactionStatus
+from .isbn_metadata import IsbnMetadata
+from .metadata_job import MetadataJob, MetadataJobState
+from .wish import Wish, SwapCycle
+from .watch import Watch, WatchKind, WatchIndexState
@@ -1,15 +1,25 @@
 import enum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, Enum
+from sqlalchemy import String, ForeignKey, Enum, Index, text
 from app.core.database import Base
 
 class BookStatus(str, enum.Enum):
     AVAILABLE = "AVAILABLE"
     PENDING = "PENDING"
     SWAPPED = "SWAPPED"
+    PENDING_METADATA = "PENDING_METADATA" # Listed, details still being looked up
 
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        Index("ix_books_owner_id_status", "owner_id", "status"),
+        Index("ix_books_available_id", "id",
+              postgresql_where=text("status = 'AVAILABLE'"), sqlite_where=text("status = 'AVAILABLE'")),
+        Index("ix_books_available_title_id", "title", "id",
+              postgresql_where=text("status = 'AVAILABLE'"), sqlite_where=text("status = 'AVAILABLE'")),
+        Index("ix_books_available_isbn", "isbn",
+              postgresql_where=text("status = 'AVAILABLE'"), sqlite_where=text("status = 'AVAILABLE'")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String, index=True)
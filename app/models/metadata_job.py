@@ -0,0 +1,32 @@
+import enum
+from datetime import datetime, timezone
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, ForeignKey, Enum, DateTime, Index
+from app.core.database import Base
+
+class MetadataJobState(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    NOT_FOUND = "NOT_FOUND"
+    DEAD = "DEAD" # Retries exhausted
+
+class MetadataJob(Base):
+    """Background lookup of a PENDING_METADATA book's details (see app.services.enrichment)."""
+    __tablename__ = "metadata_jobs"
+    __table_args__ = (
+        Index("ix_metadata_jobs_state_next_attempt_at", "state", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), unique=True)
+    isbn: Mapped[str] = mapped_column(String)
+    state: Mapped[MetadataJobState] = mapped_column(Enum(MetadataJobState), default=MetadataJobState.QUEUED)
+    attempts: Mapped[int] = mapped_column(default=0)
+    # When a QUEUED job becomes due, or when a RUNNING job's lease runs out
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    book: Mapped["Book"] = relationship()
@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, Enum, DateTime
+from sqlalchemy import String, ForeignKey, Enum, DateTime, Index
 from app.core.database import Base
 
 class TransactionStatus(str, enum.Enum):
@@ -12,6 +12,10 @@ class TransactionStatus(str, enum.Enum):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_giver_id_created_at", "giver_id", "created_at"),
+        Index("ix_transactions_receiver_id_created_at", "receiver_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     book_id: Mapped[int] = mapped_column(ForeignKey("books.id"))
@@ -21,8 +25,10 @@ class Transaction(Base):
     status: Mapped[TransactionStatus] = mapped_column(Enum(TransactionStatus), default=TransactionStatus.REQUESTED)
     tracking_number: Mapped[str | None] = mapped_column(String, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    cycle_id: Mapped[int | None] = mapped_column(ForeignKey("swap_cycles.id"), nullable=True, index=True) # Multi-party trade
 
     book: Mapped["Book"] = relationship(foreign_keys=[book_id])
     offered_book: Mapped["Book"] = relationship(foreign_keys=[offered_book_id])
     giver: Mapped["User"] = relationship(foreign_keys=[giver_id])
     receiver: Mapped["User"] = relationship(foreign_keys=[receiver_id])
+    cycle: Mapped["SwapCycle"] = relationship(back_populates="transactions")
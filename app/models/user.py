@@ -11,5 +11,8 @@ class User(Base):
     password_hash: Mapped[str] = mapped_column(String)
     is_kyc_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     points: Mapped[int] = mapped_column(Integer, default=0)
+    # Denormalized stats, maintained by app.services.user_stats
+    books_listed: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    books_swapped: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     books: Mapped[list["Book"]] = relationship(back_populates="owner")
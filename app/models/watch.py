@@ -0,0 +1,39 @@
+import enum
+from datetime import datetime, timezone
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, ForeignKey, Enum, DateTime, UniqueConstraint
+from app.core.database import Base
+
+class WatchKind(str, enum.Enum):
+    ISBN = "ISBN"
+    AUTHOR = "AUTHOR" # Every word of value appears in the author
+    TITLE = "TITLE" # Every word of value appears in the title
+
+class Watch(Base):
+    """Alerts a user when a matching book is listed (see app.services.watches)."""
+    __tablename__ = "watches"
+    __table_args__ = (
+        UniqueConstraint("user_id", "kind", "value", name="uq_watches_user_id_kind_value"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    kind: Mapped[WatchKind] = mapped_column(Enum(WatchKind))
+    value: Mapped[str] = mapped_column(String) # Normalized: bare ISBN, or space-separated lowercase words
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    last_matched_book_id: Mapped[int | None] = mapped_column(ForeignKey("books.id"), nullable=True)
+    last_matched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    version: Mapped[int] = mapped_column(default=0, index=True) # WatchIndexState.version that added it
+
+class WatchIndexState(Base):
+    """
+    Single row (id 1) versioning the watches table for the in-memory indexes.
+    Every change bumps version, which also row-locks it, so watch changes
+    commit in version order. reset_version is the last version that removed
+    watches: a process loaded before it has to reload everything.
+    """
+    __tablename__ = "watch_index_state"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+    reset_version: Mapped[int] = mapped_column(default=0)
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, ForeignKey, DateTime, UniqueConstraint
+from app.core.database import Base
+
+class Wish(Base):
+    """A user wants any listed copy of this ISBN (see app.services.matching)."""
+    __tablename__ = "wishes"
+    __table_args__ = (
+        UniqueConstraint("user_id", "isbn", name="uq_wishes_user_id_isbn"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    isbn: Mapped[str] = mapped_column(String, index=True) # Normalized
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    user: Mapped["User"] = relationship()
+
+class SwapCycle(Base):
+    """Links the Transactions of one multi-party trade: each member gives one book and receives one."""
+    __tablename__ = "swap_cycles"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    size: Mapped[int] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    transactions: Mapped[list["Transaction"]] = relationship(back_populates="cycle")
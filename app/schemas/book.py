@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import List, Optional
 
 class BookCreate(BaseModel):
     isbn: str
@@ -15,5 +16,28 @@ class BookResponse(BaseModel):
     status: str
     owner_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class BookBatchCreate(BaseModel):
+    items: List[BookCreate]
+
+class BookBatchItemResult(BaseModel):
+    index: int
+    isbn: str
+    book: Optional[BookResponse] = None
+    error: Optional[str] = None
+
+class BookBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BookBatchItemResult]
+
+class MetadataJobResponse(BaseModel):
+    book_id: int
+    state: str
+    attempts: int
+    next_attempt_at: datetime
+    last_error: Optional[str] = None
+    book: BookResponse
+
+    model_config = ConfigDict(from_attributes=True)
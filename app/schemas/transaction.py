@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from app.models.transaction import TransactionStatus
 
 class TransactionBase(BaseModel):
@@ -21,9 +21,21 @@ class TransactionResponse(BaseModel):
     status: TransactionStatus
     tracking_number: str | None
     created_at: datetime
+    cycle_id: int | None = None # Set for legs of a multi-party trade
 
-    # Optional: Include Book title/author strings if needed for simple display
-    # For now, sticking to IDs to keep it simple, client can fetch book details or we can expand later
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        from_attributes = True
+class SwapBookSummary(BaseModel):
+    id: int
+    title: str
+    author: str
+    image_url: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SwapDetailResponse(TransactionResponse):
+    book: SwapBookSummary
+    offered_book: SwapBookSummary | None = None
+    giver_username: str
+    receiver_username: str
+    counterparty_username: str
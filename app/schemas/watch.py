@@ -0,0 +1,17 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from app.models.watch import WatchKind
+
+class WatchCreate(BaseModel):
+    kind: WatchKind
+    value: str
+
+class WatchResponse(BaseModel):
+    id: int
+    kind: WatchKind
+    value: str
+    created_at: datetime
+    last_matched_book_id: int | None = None
+    last_matched_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
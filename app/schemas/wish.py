@@ -0,0 +1,12 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+class WishCreate(BaseModel):
+    isbn: str
+
+class WishResponse(BaseModel):
+    id: int
+    isbn: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
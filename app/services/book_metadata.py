@@ -0,0 +1,159 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import httpx
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache, MISSING
+from app.core.config import settings
+from app.core.http import http_client
+from app.models.isbn_metadata import IsbnMetadata
+
+class MetadataUnavailable(Exception):
+    """Google Books could not be reached or answered with an error."""
+
+metadata_cache = TTLCache(maxsize=settings.ISBN_CACHE_SIZE, ttl=settings.ISBN_CACHE_TTL_SECONDS)
+
+# Lookups that had to go past the in-process tier
+lookup_stats = {"db_hits": 0, "upstream_fetches": 0, "upstream_errors": 0}
+
+def normalize_isbn(isbn: str) -> str:
+    return isbn.replace("-", "").replace(" ", "").strip().upper()
+
+async def fetch_google_books_data(isbn: str):
+    response = await http_client.get(settings.GOOGLE_BOOKS_API_URL, params={"q": f"isbn:{isbn}"})
+    if response.status_code != 200:
+        raise MetadataUnavailable(f"Google Books returned {response.status_code}")
+    try:
+        data = response.json()
+    except ValueError:
+        # An HTML error page or captive portal answering with 200
+        raise MetadataUnavailable("Google Books returned a non-JSON response")
+    if "totalItems" in data and data["totalItems"] == 0:
+        return None
+
+    # Get first result
+    try:
+         volume_info = data["items"][0]["volumeInfo"]
+         title = volume_info.get("title", "Unknown Title")
+         authors = volume_info.get("authors", ["Unknown Author"])
+         author = ", ".join(authors)
+         image_links = volume_info.get("imageLinks", {})
+         image_url = image_links.get("thumbnail") or image_links.get("smallThumbnail")
+
+         return {
+             "title": title,
+             "author": author,
+             "image_url": image_url
+         }
+    except (KeyError, IndexError, TypeError):
+        return None
+
+def _cache_ttl(metadata) -> int:
+    return settings.ISBN_CACHE_TTL_SECONDS if metadata else settings.ISBN_NEGATIVE_CACHE_TTL_SECONDS
+
+async def get_book_metadata(isbn: str, db: AsyncSession, strict: bool = False):
+    """
+    Resolves ISBN metadata through the in-process LRU, then the isbn_metadata
+    table, and only then Google Books. "Not found" answers are cached as well,
+    with a shorter TTL; upstream errors are never cached. An upstream error
+    returns MISSING (the answer is still unknown), or with strict=True raises
+    MetadataUnavailable.
+    """
+    key = normalize_isbn(isbn)
+    return (await get_book_metadata_many([key], db, strict=strict))[key]
+
+async def peek_book_metadata(isbn: str, db: AsyncSession):
+    """
+    Like get_book_metadata, but never leaves the process: answers from the LRU
+    or the isbn_metadata table, or returns MISSING if only Google Books knows.
+    """
+    key = normalize_isbn(isbn)
+    results, _, to_fetch = await _resolve_known([key], db)
+    return MISSING if to_fetch else results[key]
+
+async def _resolve_known(keys: list[str], db: AsyncSession):
+    """Answers what the cache tiers can; returns (results, db rows, keys left to fetch)."""
+    results = {}
+    pending = []
+    for key in dict.fromkeys(keys):
+        cached = metadata_cache.get(key)
+        if cached is MISSING:
+            pending.append(key)
+        else:
+            results[key] = cached
+    if not pending:
+        return results, {}, []
+
+    rows = {
+        row.isbn: row
+        for row in (await db.execute(select(IsbnMetadata).where(IsbnMetadata.isbn.in_(pending)))).scalars()
+    }
+    negative_ttl = timedelta(seconds=settings.ISBN_NEGATIVE_CACHE_TTL_SECONDS)
+    to_fetch = []
+    for key in pending:
+        row = rows.get(key)
+        if row and (row.found or datetime.now(timezone.utc) - _aware(row.fetched_at) < negative_ttl):
+            lookup_stats["db_hits"] += 1
+            metadata = {"title": row.title, "author": row.author, "image_url": row.image_url} if row.found else None
+            metadata_cache.set(key, metadata, ttl=_cache_ttl(metadata))
+            results[key] = metadata
+        else:
+            to_fetch.append(key)
+    return results, rows, to_fetch
+
+async def get_book_metadata_many(isbns: list[str], db: AsyncSession, concurrency: int = 1, strict: bool = False) -> dict:
+    """
+    Batch form of get_book_metadata, keyed by normalized ISBN. Each distinct
+    ISBN is resolved once: one query covers the database tier and up to
+    `concurrency` Google Books requests run at a time. ISBNs whose lookup
+    failed upstream map to MISSING rather than to None ("not found").
+    """
+    results, rows, to_fetch = await _resolve_known([normalize_isbn(isbn) for isbn in isbns], db)
+    if not to_fetch:
+        return results
+
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(key):
+        async with limit:
+            lookup_stats["upstream_fetches"] += 1
+            try:
+                return await fetch_google_books_data(key)
+            except (MetadataUnavailable, httpx.HTTPError) as exc:
+                lookup_stats["upstream_errors"] += 1
+                return MetadataUnavailable(str(exc) or exc.__class__.__name__)
+
+    fetched = await asyncio.gather(*(fetch(key) for key in to_fetch))
+    now = datetime.now(timezone.utc)
+    failure = None
+    for key, metadata in zip(to_fetch, fetched):
+        if isinstance(metadata, MetadataUnavailable):
+            failure = metadata
+            results[key] = MISSING
+            continue
+        row = rows.get(key) or IsbnMetadata(isbn=key)
+        row.found = metadata is not None
+        row.title = metadata["title"] if metadata else None
+        row.author = metadata["author"] if metadata else None
+        row.image_url = metadata["image_url"] if metadata else None
+        row.fetched_at = now
+        db.add(row)
+        metadata_cache.set(key, metadata, ttl=_cache_ttl(metadata))
+        results[key] = metadata
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request stored the same ISBN first; its row is just as good
+        await db.rollback()
+    if strict and failure:
+        raise failure
+    return results
+
+def _aware(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def cache_stats() -> dict:
+    return {**metadata_cache.stats(), **lookup_stats}
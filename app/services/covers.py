@@ -0,0 +1,174 @@
+"""
+Cover thumbnails.
+
+Each distinct image_url is downloaded once; every size in COVER_SIZES is cut
+from it with Pillow and stored content-addressed on disk:
+
+    <COVER_CACHE_DIR>/blobs/<sha256 of the JPEG>.jpg
+    <COVER_CACHE_DIR>/refs/<sha256 of "size|image_url">   (holds the blob digest)
+
+The blob digest doubles as the strong ETag, and books sharing a cover share
+its blobs. Blob mtimes are touched on every hit, and the least recently used
+blobs are evicted once the directory grows past COVER_CACHE_MAX_BYTES.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+import httpx
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.core.http import http_client
+
+COVER_SIZES = {
+    "small": (50, 75),
+    "medium": (128, 192),
+    "large": (256, 384),
+}
+
+class CoverUnavailable(Exception):
+    """The source image could not be downloaded or decoded."""
+
+def _render(source: bytes) -> dict[str, bytes]:
+    try:
+        image = Image.open(BytesIO(source))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise CoverUnavailable(f"Unreadable cover image: {exc}")
+    image = image.convert("RGB")
+    thumbnails = {}
+    for size, dimensions in COVER_SIZES.items():
+        out = BytesIO()
+        ImageOps.fit(image, dimensions, Image.Resampling.LANCZOS).save(
+            out, "JPEG", quality=settings.COVER_JPEG_QUALITY, optimize=True
+        )
+        thumbnails[size] = out.getvalue()
+    return thumbnails
+
+class CoverCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.root = Path(directory)
+        self.max_bytes = max_bytes
+        self._blobs: OrderedDict[str, int] | None = None # digest -> size, least recently used first
+        self._total = 0
+        self._lock = threading.Lock() # _lookup/_store run on worker threads
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "upstream_fetches": 0, "upstream_errors": 0, "evictions": 0}
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / f"{digest}.jpg"
+
+    def _ref_path(self, image_url: str, size: str) -> Path:
+        return self.root / "refs" / hashlib.sha256(f"{size}|{image_url}".encode()).hexdigest()
+
+    def _index(self) -> OrderedDict:
+        if self._blobs is None:
+            (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+            (self.root / "refs").mkdir(parents=True, exist_ok=True)
+            entries = sorted(
+                (entry.stat().st_mtime, entry.name.removesuffix(".jpg"), entry.stat().st_size)
+                for entry in os.scandir(self.root / "blobs")
+            )
+            self._blobs = OrderedDict((digest, size) for _, digest, size in entries)
+            self._total = sum(self._blobs.values())
+        return self._blobs
+
+    def _lookup(self, image_url: str, size: str) -> tuple[str, Path] | None:
+        try:
+            digest = self._ref_path(image_url, size).read_text().strip()
+        except OSError:
+            return None
+        path = self._blob_path(digest)
+        with self._lock:
+            blobs = self._index()
+            if digest not in blobs or not path.exists():
+                return None
+            blobs.move_to_end(digest)
+            os.utime(path)
+        return digest, path
+
+    def _store(self, image_url: str, thumbnails: dict[str, bytes]) -> None:
+        with self._lock:
+            blobs = self._index()
+            for size, data in thumbnails.items():
+                digest = hashlib.sha256(data).hexdigest()
+                if digest not in blobs:
+                    tmp = self._blob_path(digest).with_suffix(".tmp")
+                    tmp.write_bytes(data)
+                    os.replace(tmp, self._blob_path(digest))
+                    blobs[digest] = len(data)
+                    self._total += len(data)
+                else:
+                    blobs.move_to_end(digest)
+                ref = self._ref_path(image_url, size)
+                ref.with_suffix(".tmp").write_text(digest)
+                os.replace(ref.with_suffix(".tmp"), ref)
+            self._evict()
+
+    def _evict(self) -> None:
+        # Refs left pointing at an evicted blob read as misses and get rebuilt
+        while self._total > self.max_bytes and len(self._blobs) > len(COVER_SIZES):
+            digest, size = self._blobs.popitem(last=False)
+            self._blob_path(digest).unlink(missing_ok=True)
+            self._total -= size
+            self.stats["evictions"] += 1
+
+    async def _download(self, image_url: str) -> bytes:
+        # Streamed, so an oversized (or endless) source is dropped once it passes the cap
+        limit = settings.COVER_MAX_SOURCE_BYTES
+        try:
+            async with http_client.stream(image_url) as response:
+                if response.status_code != 200:
+                    raise CoverUnavailable(f"Cover download failed with status {response.status_code}")
+                length = response.headers.get("content-length", "")
+                if length.isdigit() and int(length) > limit:
+                    raise CoverUnavailable(f"Cover is larger than {limit} bytes")
+                chunks = []
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    received += len(chunk)
+                    if received > limit:
+                        raise CoverUnavailable(f"Cover is larger than {limit} bytes")
+                    chunks.append(chunk)
+        except httpx.HTTPError as exc:
+            raise CoverUnavailable(f"Cover download failed: {exc}")
+        return b"".join(chunks)
+
+    async def _fetch_and_store(self, image_url: str) -> None:
+        self.stats["upstream_fetches"] += 1
+        try:
+            source = await self._download(image_url)
+        except CoverUnavailable:
+            self.stats["upstream_errors"] += 1
+            raise
+        thumbnails = await asyncio.to_thread(_render, source)
+        await asyncio.to_thread(self._store, image_url, thumbnails)
+
+    async def get(self, image_url: str, size: str) -> tuple[str, Path]:
+        """Returns (digest, path) of the thumbnail, downloading the source at most once at a time."""
+        found = await asyncio.to_thread(self._lookup, image_url, size)
+        if found:
+            self.stats["hits"] += 1
+            return found
+        self.stats["misses"] += 1
+
+        task = self._inflight.get(image_url)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(image_url))
+            self._inflight[image_url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(image_url, None))
+        await asyncio.shield(task)
+
+        found = await asyncio.to_thread(self._lookup, image_url, size)
+        if not found:
+            raise CoverUnavailable("Cover was evicted before it could be served")
+        return found
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "blobs": len(self._blobs or ()), "bytes": self._total}
+
+cover_cache = CoverCache(settings.COVER_CACHE_DIR, settings.COVER_CACHE_MAX_BYTES)
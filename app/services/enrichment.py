@@ -0,0 +1,253 @@
+"""
+Background metadata enrichment.
+
+create_book lists a book straight away in PENDING_METADATA and leaves a
+metadata_jobs row behind; the workers here pick those rows up, look the ISBN
+up (cache tiers first, Google Books under a token bucket) and flip the book to
+AVAILABLE. Job state lives in the database, so nothing is lost on restart and
+several processes can share the queue:
+
+    QUEUED -> RUNNING -> DONE | NOT_FOUND
+                 |-> QUEUED (retry with backoff) -> ... -> DEAD
+
+A lookup that ends NOT_FOUND takes its book with it. The job and the book
+are deleted, the owner's books_listed is given back and the owner gets a
+`book_removed` event. DEAD only means Google Books kept failing, so a DEAD
+job stays behind as a dead letter with its PENDING_METADATA book, until the
+owner puts it back on the queue (POST /books/{id}/metadata/retry).
+
+A claim is a conditional UPDATE that also sets a lease in next_attempt_at; a
+RUNNING job whose lease ran out (its worker died) is claimed again.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.book import Book, BookStatus
+from app.models.metadata_job import MetadataJob, MetadataJobState
+from app.services.book_metadata import MetadataUnavailable, get_book_metadata, peek_book_metadata
+from app.services.events import event_bus
+from app.services.matching import matching_engine
+from app.services.user_stats import increment_books_listed
+from app.services.watches import notify_watchers
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATES = {MetadataJobState.DONE, MetadataJobState.NOT_FOUND, MetadataJobState.DEAD}
+
+class RateLimiter:
+    """Token bucket shared by the workers of one process."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def enqueue(db: AsyncSession, book: Book) -> MetadataJob:
+    """Adds the job for a freshly created PENDING_METADATA book; the caller commits."""
+    job = MetadataJob(book=book, isbn=book.isbn, state=MetadataJobState.QUEUED, attempts=0)
+    db.add(job)
+    return job
+
+def retry_delay(attempts: int) -> float:
+    return min(settings.ENRICHMENT_RETRY_MAX_SECONDS, settings.ENRICHMENT_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+class EnrichmentQueue:
+    """
+    Runs ENRICHMENT_WORKERS asyncio tasks for the lifetime of the app. Workers
+    sleep until notify() is called in this process or the poll interval
+    passes (retries coming due, jobs queued by other processes).
+    """
+
+    def __init__(self):
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._finished: dict[int, asyncio.Event] = {}
+        self._waiters: dict[int, int] = {}
+        self._limiter = RateLimiter(settings.ENRICHMENT_RATE_PER_SECOND, settings.ENRICHMENT_BURST)
+        self.stats = {"claimed": 0, "done": 0, "not_found": 0, "retried": 0, "dead": 0}
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(settings.ENRICHMENT_WORKERS)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    async def wait_for(self, book_id: int, timeout: float) -> None:
+        """Returns when a worker in this process finishes the book's job, or after timeout."""
+        event = self._finished.setdefault(book_id, asyncio.Event())
+        self._waiters[book_id] = self._waiters.get(book_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters[book_id] -= 1
+            if not self._waiters[book_id]:
+                del self._waiters[book_id]
+                if self._finished.get(book_id) is event:
+                    del self._finished[book_id]
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                job = await self._claim()
+                if job is not None:
+                    await self._process(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Metadata enrichment worker error")
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.ENRICHMENT_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self):
+        async with AsyncSessionLocal() as db:
+            while True:
+                now = datetime.now(timezone.utc)
+                due = (
+                    MetadataJob.state.in_([MetadataJobState.QUEUED, MetadataJobState.RUNNING]),
+                    MetadataJob.next_attempt_at <= now,
+                )
+                job_id = await db.scalar(
+                    select(MetadataJob.id).where(*due).order_by(MetadataJob.next_attempt_at).limit(1)
+                )
+                if job_id is None:
+                    return None
+                result = await db.execute(
+                    update(MetadataJob)
+                    .where(MetadataJob.id == job_id, *due)
+                    .values(
+                        state=MetadataJobState.RUNNING,
+                        attempts=MetadataJob.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=settings.ENRICHMENT_LEASE_SECONDS),
+                        updated_at=now,
+                    )
+                    .returning(MetadataJob.id, MetadataJob.book_id, MetadataJob.isbn, MetadataJob.attempts)
+                )
+                job = result.first()
+                await db.commit()
+                if job is not None:
+                    self.stats["claimed"] += 1
+                    return job
+                # Another worker got there first; look for the next one
+
+    async def _process(self, job) -> None:
+        metadata = MISSING
+        error = None
+        try:
+            async with AsyncSessionLocal() as db:
+                metadata = await peek_book_metadata(job.isbn, db)
+                if metadata is MISSING:
+                    await self._limiter.acquire()
+                    metadata = await get_book_metadata(job.isbn, db, strict=True)
+        except MetadataUnavailable as exc:
+            error = str(exc)
+        except Exception as exc:
+            logger.exception("Metadata lookup failed for book %s", job.book_id)
+            error = repr(exc)
+
+        now = datetime.now(timezone.utc)
+        values = {"updated_at": now, "last_error": error}
+        if error is None and metadata is None:
+            values.update(state=MetadataJobState.NOT_FOUND, last_error="Book not found on Google Books")
+            self.stats["not_found"] += 1
+        elif error is None:
+            values["state"] = MetadataJobState.DONE
+            self.stats["done"] += 1
+        elif job.attempts >= settings.ENRICHMENT_MAX_ATTEMPTS:
+            values["state"] = MetadataJobState.DEAD
+            self.stats["dead"] += 1
+        else:
+            values.update(state=MetadataJobState.QUEUED, next_attempt_at=now + timedelta(seconds=retry_delay(job.attempts)))
+            self.stats["retried"] += 1
+
+        # Fenced on the attempt number so a worker whose lease expired can't overwrite a newer run
+        fence = (
+            MetadataJob.id == job.id,
+            MetadataJob.state == MetadataJobState.RUNNING,
+            MetadataJob.attempts == job.attempts,
+        )
+        removed_from = None
+        async with AsyncSessionLocal() as db:
+            if values["state"] == MetadataJobState.NOT_FOUND:
+                listed = False
+                if (await db.execute(delete(MetadataJob).where(*fence).returning(MetadataJob.id))).first():
+                    removed_from = await db.scalar(
+                        delete(Book)
+                        .where(Book.id == job.book_id, Book.status == BookStatus.PENDING_METADATA)
+                        .returning(Book.owner_id)
+                    )
+                    if removed_from is not None:
+                        await increment_books_listed(db, removed_from, -1)
+            else:
+                result = await db.execute(update(MetadataJob).where(*fence).values(**values).returning(MetadataJob.id))
+                listed = result.scalar_one_or_none() is not None and values["state"] == MetadataJobState.DONE
+            if listed:
+                await db.execute(
+                    update(Book)
+                    .where(Book.id == job.book_id, Book.status == BookStatus.PENDING_METADATA)
+                    .values(
+                        title=metadata["title"],
+                        author=metadata["author"],
+                        image_url=metadata["image_url"],
+                        status=BookStatus.AVAILABLE,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        if removed_from is not None:
+            event_bus.publish((removed_from,), "book_removed", {"id": job.book_id, "isbn": job.isbn, "reason": values["last_error"]})
+        if listed:
+            # The book is AVAILABLE now: it may complete a trade cycle, and title/author watches can see it
+            matching_engine.notify_isbn(job.isbn)
+            async with AsyncSessionLocal() as db:
+                book = await db.get(Book, job.book_id)
+            if book is not None:
+                await notify_watchers([book])
+
+        if values["state"] in FINISHED_STATES:
+            event = self._finished.pop(job.book_id, None)
+            if event is not None:
+                event.set()
+
+    def snapshot(self) -> dict:
+        return {"workers": len(self._tasks), **self.stats}
+
+async def backlog(db: AsyncSession) -> dict:
+    """Job counts per state; DEAD rows are the dead-letter list. NOT_FOUND jobs are deleted with their books."""
+    result = await db.execute(select(MetadataJob.state, func.count()).group_by(MetadataJob.state))
+    return {state.value: count for state, count in result.all()}
+
+enrichment_queue = EnrichmentQueue()
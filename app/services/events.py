@@ -0,0 +1,94 @@
+"""
+Per-user event fan-out for the GET /events stream.
+
+EventBus is in-process: an event published by one worker only reaches
+streams held open by that same worker. Anything with publish(), subscribe()
+and close() can replace `event_bus` (e.g. a Redis or Postgres LISTEN/NOTIFY
+backed bus) once the API runs more than one worker.
+"""
+import asyncio
+import itertools
+from typing import Iterable
+
+from app.core.config import settings
+
+RESYNC = "resync" # Sent instead of the events a slow subscriber missed
+
+class Subscription:
+    def __init__(self, bus: "EventBus", user_id: int):
+        self.bus = bus
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, event: dict | None) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog; the client reloads everything on RESYNC
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"id": None, "type": RESYNC, "data": {}})
+
+    async def get(self, timeout: float) -> dict | None:
+        """Next event; None when the bus is closing. Raises TimeoutError when idle."""
+        event = await asyncio.wait_for(self.queue.get(), timeout)
+        if event is not None and event["type"] == RESYNC:
+            self.overflowed = False
+        return event
+
+    def close(self) -> None:
+        self.bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class EventBus:
+    def __init__(self):
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._ids = itertools.count(1)
+        self.stats = {"published": 0, "delivered": 0, "overflows": 0}
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(self, user_id)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def publish(self, user_ids: Iterable[int], event_type: str, data: dict) -> None:
+        """Queues the event for every open stream of the given users. Never blocks."""
+        event = {"id": next(self._ids), "type": event_type, "data": data}
+        self.stats["published"] += 1
+        for user_id in set(user_ids):
+            for subscription in self._subscribers.get(user_id, ()):
+                was_overflowed = subscription.overflowed
+                subscription.push(event)
+                if subscription.overflowed and not was_overflowed:
+                    self.stats["overflows"] += 1
+                elif not subscription.overflowed:
+                    self.stats["delivered"] += 1
+
+    def close(self) -> None:
+        """Ends every open stream (app shutdown)."""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "streams": sum(len(s) for s in self._subscribers.values())}
+
+event_bus = EventBus()
@@ -0,0 +1,166 @@
+"""
+Multi-party swap matching.
+
+The want-graph has a node per user and an edge U -> O whenever U wishes for
+an ISBN that O has AVAILABLE. A cycle U1 -> U2 -> ... -> Uk -> U1 is a trade
+in which every member receives a wished-for book from the next member and
+gives one to the previous. Two-user cycles are mutual wishes.
+
+Matching is incremental. Only users whose outgoing edges just changed are
+searched: someone who added a wish, or the wishers of an ISBN that gained an
+AVAILABLE copy. Each search is a breadth-first walk from that seed with one
+query per level, up to MATCHING_MAX_CYCLE_LENGTH. The shortest cycle back to
+the seed wins, since short cycles are the likeliest to complete.
+swaps.create_cycle claims every book in the same transaction that records
+the cycle, so two cycles can never share a book.
+
+The graph is never held in memory. Each level reads its edges through the
+wishes (isbn) and partial books (isbn WHERE status = 'AVAILABLE') indexes.
+Both sides hold normalized ISBNs (see book_metadata.normalize_isbn).
+"""
+import asyncio
+import logging
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.book import Book, BookStatus
+from app.models.wish import Wish
+from app.services import swaps
+from app.services.book_metadata import normalize_isbn
+
+logger = logging.getLogger(__name__)
+
+Leg = tuple[int, int, int, str] # (receiver_id, giver_id, book_id, isbn)
+
+async def _out_edges(db: AsyncSession, user_ids: list[int], only_to: int | None = None) -> list[Leg]:
+    """Edges leaving user_ids, each with the lowest-id AVAILABLE copy that satisfies it."""
+    query = (
+        select(Wish.user_id, Book.owner_id, Book.id, Book.isbn)
+        .join(Book, and_(Book.isbn == Wish.isbn, Book.status == BookStatus.AVAILABLE, Book.owner_id != Wish.user_id))
+        .where(Wish.user_id.in_(user_ids))
+    )
+    if only_to is not None:
+        query = query.where(Book.owner_id == only_to)
+    result = await db.execute(query.order_by(Book.id).limit(settings.MATCHING_MAX_EDGES))
+    edges = {}
+    for receiver_id, giver_id, book_id, isbn in result.all():
+        edges.setdefault((receiver_id, giver_id), (receiver_id, giver_id, book_id, isbn))
+    return list(edges.values())
+
+async def find_cycle(db: AsyncSession, seed: int, max_length: int | None = None) -> list[Leg] | None:
+    """Shortest trade cycle through seed, as legs in want order starting from seed; None if there is none."""
+    max_length = max_length or settings.MATCHING_MAX_CYCLE_LENGTH
+    parents: dict[int, Leg | None] = {seed: None} # user -> the leg that reached them
+    frontier = [seed]
+    for depth in range(1, max_length + 1):
+        if not frontier:
+            return None
+        # On the last level only an edge back to the seed is any use
+        edges = await _out_edges(db, frontier, only_to=seed if depth == max_length else None)
+        closing = None
+        next_frontier = []
+        for leg in edges:
+            receiver_id, giver_id = leg[0], leg[1]
+            if giver_id == seed:
+                if depth >= 2 and closing is None:
+                    closing = leg
+            elif giver_id not in parents:
+                parents[giver_id] = leg
+                next_frontier.append(giver_id)
+        if closing is not None:
+            legs = [closing]
+            leg = parents[closing[0]]
+            while leg is not None:
+                legs.append(leg)
+                leg = parents[leg[0]]
+            legs.reverse()
+            return legs
+        frontier = next_frontier[:settings.MATCHING_MAX_FRONTIER]
+    return None
+
+class MatchingEngine:
+    """
+    One asyncio task per process that drains seeds queued by notify_users()
+    and notify_isbn(). Seeds only live in memory; the next change to the
+    same part of the graph seeds it again.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._users: set[int] = set()
+        self._isbns: set[str] = set()
+        self.stats = {"searches": 0, "cycles": 0, "legs": 0, "conflicts": 0}
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def notify_users(self, user_ids) -> None:
+        """These users' wishes changed."""
+        self._users.update(user_ids)
+        self._wake.set()
+
+    def notify_isbn(self, isbn: str | None) -> None:
+        """An AVAILABLE copy of isbn was listed."""
+        if isbn:
+            self._isbns.add(normalize_isbn(isbn))
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                await self._drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Swap matching failed")
+
+    async def _drain(self) -> None:
+        while self._users or self._isbns:
+            if self._isbns:
+                isbns, self._isbns = list(self._isbns), set()
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(Wish.user_id).where(Wish.isbn.in_(isbns))
+                        .order_by(Wish.created_at).limit(settings.MATCHING_MAX_SEEDS_PER_ISBN)
+                    )
+                    self._users.update(result.scalars().all())
+                continue
+            await self.match(self._users.pop())
+
+    async def match(self, seed: int) -> int:
+        """Records cycles through seed until none is left; returns how many."""
+        found = 0
+        attempts = 0
+        async with AsyncSessionLocal() as db:
+            while found < settings.MATCHING_MAX_CYCLES_PER_SEED and attempts < 2 * settings.MATCHING_MAX_CYCLES_PER_SEED:
+                attempts += 1
+                self.stats["searches"] += 1
+                legs = await find_cycle(db, seed)
+                await db.rollback()
+                if legs is None:
+                    break
+                if await swaps.create_cycle(db, legs) is None:
+                    # A book was taken since the search; look again
+                    self.stats["conflicts"] += 1
+                    continue
+                found += 1
+                self.stats["cycles"] += 1
+                self.stats["legs"] += len(legs)
+                logger.info("Swap cycle of %d matched through user %d", len(legs), seed)
+        return found
+
+    def snapshot(self) -> dict:
+        return {"pending_users": len(self._users), "pending_isbns": len(self._isbns), **self.stats}
+
+matching_engine = MatchingEngine()
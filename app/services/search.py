@@ -0,0 +1,70 @@
+from sqlalchemy import select, func, literal_column, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.book import Book, BookStatus
+from app.services.book_metadata import normalize_isbn
+
+# Inline SQL literals, not bound parameters: the planner only uses the
+# ix_books_search_tsv expression index (migration 0002) when the query spells
+# out the very same expression, constants included
+_SIMPLE = literal_column("'simple'")
+_EMPTY = literal_column("''")
+_SPACE = literal_column("' '")
+
+def _postgres_query(q: str, limit: int):
+    document = func.to_tsvector(
+        _SIMPLE, func.coalesce(Book.title, _EMPTY) + _SPACE + func.coalesce(Book.author, _EMPTY)
+    )
+    ts_query = func.websearch_to_tsquery(_SIMPLE, q)
+    rank = func.ts_rank(document, ts_query) + func.greatest(
+        func.similarity(Book.title, q), func.similarity(Book.author, q)
+    )
+    return (
+        select(Book)
+        .where(Book.status == BookStatus.AVAILABLE)
+        .where(or_(
+            document.op("@@")(ts_query),
+            Book.title.op("%")(q),
+            Book.author.op("%")(q),
+            Book.isbn == normalize_isbn(q),
+        ))
+        .order_by(rank.desc(), Book.id)
+        .limit(limit)
+    )
+
+def _fts5_match(q: str) -> str:
+    # Quote every term so user input can't inject FTS5 query syntax
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+def _sqlite_query(q: str, limit: int):
+    return (
+        select(Book)
+        .from_statement(text(
+            "SELECT books.* FROM books_fts JOIN books ON books.id = books_fts.rowid "
+            "WHERE books_fts MATCH :match AND books.status = :status "
+            "ORDER BY bm25(books_fts), books.id LIMIT :limit"
+        ))
+        .params(match=_fts5_match(q), status=BookStatus.AVAILABLE.name, limit=limit)
+    )
+
+async def search_books(db: AsyncSession, q: str, limit: int = 20) -> list[Book]:
+    """
+    Ranked search over title, author and ISBN of AVAILABLE books. The indexes
+    it relies on are created by migration 0002 (app.migrations).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        query = _postgres_query(q, limit)
+    elif dialect == "sqlite":
+        query = _sqlite_query(q, limit)
+    else:
+        pattern = f"%{q}%"
+        query = (
+            select(Book)
+            .where(Book.status == BookStatus.AVAILABLE)
+            .where(or_(Book.title.ilike(pattern), Book.author.ilike(pattern), Book.isbn == q))
+            .order_by(Book.id)
+            .limit(limit)
+        )
+    result = await db.execute(query)
+    return list(result.scalars().all())
@@ -0,0 +1,216 @@
+"""
+Swap state machine.
+
+Every transition is a conditional UPDATE ... WHERE status = <expected> RETURNING,
+so the database arbitrates concurrent requests: the row lock taken by the first
+UPDATE makes any racing UPDATE re-check its WHERE clause and match nothing.
+Reads are only issued on the failure path, to explain why a transition was refused.
+
+    REQUESTED -> ACCEPTED -> SHIPPED -> COMPLETED
+
+Multi-party trades found by app.services.matching enter the same machine:
+create_cycle() records one REQUESTED transaction per leg, linked by cycle_id.
+
+After each committed transition both parties get a `transaction` event on
+their GET /events streams.
+"""
+from sqlalchemy import update, delete, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.models.book import Book, BookStatus
+from app.models.transaction import Transaction, TransactionStatus
+from app.models.wish import Wish, SwapCycle
+from app.schemas.transaction import TransactionResponse
+from app.services.events import event_bus
+from app.services.user_stats import increment_books_swapped
+
+class SwapError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def _publish(tx: Transaction) -> None:
+    data = TransactionResponse.model_validate(tx).model_dump(mode="json")
+    event_bus.publish((tx.giver_id, tx.receiver_id), "transaction", data)
+
+async def _claim_book(db: AsyncSession, book_id: int, *conditions) -> int | None:
+    """AVAILABLE -> PENDING for one book; returns its owner_id, or None if refused."""
+    result = await db.execute(
+        update(Book)
+        .where(Book.id == book_id, Book.status == BookStatus.AVAILABLE, *conditions)
+        .values(status=BookStatus.PENDING)
+        .returning(Book.owner_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+async def _refuse_claim(db: AsyncSession, user_id: int, book_id: int, offered: bool) -> None:
+    """Raises the SwapError explaining why request_book couldn't claim a book."""
+    book = await db.get(Book, book_id)
+    if offered:
+        if not book:
+            raise SwapError(404, "Offered book not found")
+        if book.owner_id != user_id:
+            raise SwapError(403, "You do not own the offered book")
+        raise SwapError(400, "Offered book is not available")
+    if not book:
+        raise SwapError(404, "Book not found")
+    if book.owner_id == user_id:
+        raise SwapError(400, "Cannot request your own book")
+    raise SwapError(400, "Book is not available")
+
+async def request_book(db: AsyncSession, user_id: int, book_id: int, offered_book_id: int | None) -> Transaction:
+    claims = [(book_id, False, Book.owner_id != user_id)]
+    if offered_book_id:
+        claims.append((offered_book_id, True, Book.owner_id == user_id))
+    owners = {}
+    # Claimed in id order, like create_cycle: two crossed barters (A offers X for Y
+    # while B offers Y for X) then queue on the same row instead of deadlocking
+    for claim_id, offered, condition in sorted(claims, key=lambda claim: claim[0]):
+        owners[offered] = await _claim_book(db, claim_id, condition)
+        if owners[offered] is None:
+            await db.rollback()
+            await _refuse_claim(db, user_id, claim_id, offered)
+    giver_id = owners[False]
+
+    if not offered_book_id:
+        # Point System Fallback (if no book offered)
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id, User.points >= 1)
+            .values(points=User.points - 1)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            await db.rollback()
+            raise SwapError(400, "Insufficient points. Offer a book or earn points.")
+
+    new_tx = Transaction(
+        book_id=book_id,
+        offered_book_id=offered_book_id or None,
+        giver_id=giver_id,
+        receiver_id=user_id,
+        status=TransactionStatus.REQUESTED
+    )
+    db.add(new_tx)
+    await db.commit()
+    await db.refresh(new_tx)
+    _publish(new_tx)
+    return new_tx
+
+async def create_cycle(db: AsyncSession, legs: list[tuple[int, int, int, str]]) -> list[Transaction] | None:
+    """
+    Records a trade cycle from (receiver_id, giver_id, book_id, isbn) legs:
+    claims every book, links the transactions through a SwapCycle and removes
+    the wishes they fulfil. Returns None, with nothing written, if any book
+    was no longer AVAILABLE from its expected owner. Books are claimed in id
+    order so overlapping claims can't lock each other's rows in opposite order.
+    """
+    for _, giver_id, book_id, _ in sorted(legs, key=lambda leg: leg[2]):
+        if await _claim_book(db, book_id, Book.owner_id == giver_id) is None:
+            await db.rollback()
+            return None
+
+    cycle = SwapCycle(size=len(legs))
+    db.add(cycle)
+    await db.flush()
+    transactions = [
+        Transaction(
+            book_id=book_id,
+            giver_id=giver_id,
+            receiver_id=receiver_id,
+            status=TransactionStatus.REQUESTED,
+            cycle_id=cycle.id,
+        )
+        for receiver_id, giver_id, book_id, _ in legs
+    ]
+    db.add_all(transactions)
+    await db.execute(
+        delete(Wish)
+        .where(or_(*(and_(Wish.user_id == receiver_id, Wish.isbn == isbn) for receiver_id, _, _, isbn in legs)))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    for tx in transactions:
+        _publish(tx)
+    return transactions
+
+_STATE_ERRORS = {
+    TransactionStatus.REQUESTED: "Transaction must be in REQUESTED state",
+    TransactionStatus.ACCEPTED: "Transaction must be ACCEPTED before shipping",
+    TransactionStatus.SHIPPED: "Transaction must be SHIPPED before confirming",
+}
+
+async def _explain(db: AsyncSession, tx_id: int, user_id: int, role: str, expected: TransactionStatus, action: str):
+    """Raises for a missing or foreign transaction; returns the state error, if any."""
+    tx = await db.get(Transaction, tx_id)
+    if not tx:
+        raise SwapError(404, "Transaction not found")
+    if getattr(tx, f"{role}_id") != user_id:
+        raise SwapError(403, f"Not authorized to {action}")
+    if tx.status != expected:
+        return SwapError(400, _STATE_ERRORS[expected])
+    return None
+
+async def _advance(db: AsyncSession, tx_id: int, user_id: int, role: str, expected: TransactionStatus,
+                   target: TransactionStatus, action: str, **values) -> Transaction:
+    result = await db.execute(
+        update(Transaction)
+        .where(
+            Transaction.id == tx_id,
+            getattr(Transaction, f"{role}_id") == user_id,
+            Transaction.status == expected,
+        )
+        .values(status=target, **values)
+        .returning(Transaction)
+        .execution_options(populate_existing=True)
+    )
+    tx = result.scalars().first()
+    if tx is None:
+        await db.rollback()
+        error = await _explain(db, tx_id, user_id, role, expected, action)
+        raise error or SwapError(409, "Transaction changed concurrently, please retry")
+    return tx
+
+async def accept_request(db: AsyncSession, user_id: int, tx_id: int) -> Transaction:
+    tx = await _advance(db, tx_id, user_id, "giver", TransactionStatus.REQUESTED,
+                        TransactionStatus.ACCEPTED, "accept this request")
+    await db.commit()
+    _publish(tx)
+    return tx
+
+async def ship_book(db: AsyncSession, user_id: int, tx_id: int, tracking_number: str | None) -> Transaction:
+    if not tracking_number:
+        error = await _explain(db, tx_id, user_id, "giver", TransactionStatus.ACCEPTED, "ship this book")
+        raise error or SwapError(400, "Tracking number required")
+    tx = await _advance(db, tx_id, user_id, "giver", TransactionStatus.ACCEPTED,
+                        TransactionStatus.SHIPPED, "ship this book", tracking_number=tracking_number)
+    await db.commit()
+    _publish(tx)
+    return tx
+
+async def confirm_receipt(db: AsyncSession, user_id: int, tx_id: int) -> Transaction:
+    tx = await _advance(db, tx_id, user_id, "receiver", TransactionStatus.SHIPPED,
+                        TransactionStatus.COMPLETED, "confirm this receipt")
+
+    # Both books leave the market; the giver earns a point and the receiver's stats count the book
+    swapped_ids = [tx.book_id] + ([tx.offered_book_id] if tx.offered_book_id else [])
+    await db.execute(
+        update(Book)
+        .where(Book.id.in_(swapped_ids))
+        .values(status=BookStatus.SWAPPED)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(User)
+        .where(User.id == tx.giver_id)
+        .values(points=User.points + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await increment_books_swapped(db, tx.receiver_id)
+    await db.commit()
+    _publish(tx)
+    return tx
@@ -0,0 +1,51 @@
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.models.book import Book
+from app.models.transaction import Transaction, TransactionStatus
+
+async def increment_books_listed(db: AsyncSession, user_id: int, amount: int = 1) -> None:
+    """Bumps the counter inside the caller's transaction; the caller commits."""
+    await db.execute(
+        update(User).where(User.id == user_id).values(books_listed=User.books_listed + amount)
+    )
+
+async def increment_books_swapped(db: AsyncSession, user_id: int, amount: int = 1) -> None:
+    await db.execute(
+        update(User).where(User.id == user_id).values(books_swapped=User.books_swapped + amount)
+    )
+
+def _live_books_listed():
+    return select(func.count(Book.id)).where(Book.owner_id == User.id).scalar_subquery()
+
+def _live_books_swapped():
+    return (
+        select(func.count(Transaction.id))
+        .where(Transaction.receiver_id == User.id, Transaction.status == TransactionStatus.COMPLETED)
+        .scalar_subquery()
+    )
+
+async def find_drifted_users(db: AsyncSession) -> list:
+    """Rows of (id, books_listed, books_swapped, live_listed, live_swapped) that disagree."""
+    live_listed = _live_books_listed()
+    live_swapped = _live_books_swapped()
+    result = await db.execute(
+        select(User.id, User.books_listed, User.books_swapped, live_listed, live_swapped)
+        .where(or_(User.books_listed != live_listed, User.books_swapped != live_swapped))
+        .order_by(User.id)
+    )
+    return list(result.all())
+
+async def reconcile_user_stats(db: AsyncSession, dry_run: bool = False) -> list:
+    """Recomputes the counters from live COUNTs for every user that drifted."""
+    drifted = await find_drifted_users(db)
+    if drifted and not dry_run:
+        await db.execute(
+            update(User)
+            .where(User.id.in_([row.id for row in drifted]))
+            .values(books_listed=_live_books_listed(), books_swapped=_live_books_swapped())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    return drifted
@@ -0,0 +1,162 @@
+"""
+Watch alerts for new listings.
+
+Watches live in the database but are matched against an in-memory inverted
+index, so checking a listing costs O(words in its title and author + matches)
+no matter how many watches exist:
+
+    ISBN watches              isbn -> {watch ids}
+    AUTHOR / TITLE watches    (kind, key word) -> {watch ids}
+
+A word watch is filed under its longest word, which is usually the rarest.
+Every candidate found that way is then checked against the rest of its words.
+
+Each process keeps its own index, versioned by the single watch_index_state
+row that every watch change bumps (see bump_version). Before matching, a
+process reads that row by primary key. If watches were only added since its
+load, it reads just the rows with a newer version. After a removal it
+rebuilds the index off to the side and swaps it in.
+"""
+import asyncio
+import logging
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Iterable
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.book import Book
+from app.models.watch import Watch, WatchKind, WatchIndexState
+from app.services.book_metadata import normalize_isbn
+from app.services.events import event_bus
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+def words(text: str | None) -> list[str]:
+    """Lowercase, accent-free words of text."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _WORD.findall(folded.lower())
+
+def normalize_value(kind: WatchKind, value: str) -> str:
+    if kind == WatchKind.ISBN:
+        return normalize_isbn(value)
+    return " ".join(sorted(set(words(value)))) # Word order doesn't matter for matching
+
+async def bump_version(db: AsyncSession, removal: bool = False) -> int:
+    """
+    Records a watch change in the caller's transaction and returns the new
+    version, to be stored on added watches. The row lock this takes is held
+    until the caller commits.
+    """
+    values = {"version": WatchIndexState.version + 1}
+    if removal:
+        values["reset_version"] = WatchIndexState.version + 1
+    return await db.scalar(
+        update(WatchIndexState).where(WatchIndexState.id == 1).values(**values).returning(WatchIndexState.version)
+    )
+
+def _add(watches: dict, postings: dict, watch_id: int, user_id: int, kind: WatchKind, value: str) -> None:
+    terms = frozenset(value.split())
+    if not terms:
+        return
+    watches[watch_id] = (user_id, kind, terms)
+    key = max(terms, key=len) if kind != WatchKind.ISBN else value
+    postings.setdefault((kind, key), set()).add(watch_id)
+
+class WatchIndex:
+    def __init__(self):
+        self._watches: dict[int, tuple[int, WatchKind, frozenset[str]]] = {} # id -> (user_id, kind, words or {isbn})
+        self._postings: dict[tuple[WatchKind, str], set[int]] = {}
+        self._version: int | None = None # None until the first load
+        self._lock = asyncio.Lock()
+        self.stats = {"reloads": 0, "checked": 0, "matched": 0}
+
+    async def refresh(self, db: AsyncSession) -> None:
+        version, reset_version = (await db.execute(
+            select(WatchIndexState.version, WatchIndexState.reset_version).where(WatchIndexState.id == 1)
+        )).one()
+        if version == self._version:
+            return
+        async with self._lock:
+            if version == self._version:
+                return # Another request loaded it while this one waited
+            query = select(Watch.id, Watch.user_id, Watch.kind, Watch.value)
+            if self._version is not None and reset_version <= self._version:
+                # Only additions since the last load; adding a watch twice is harmless
+                rows = (await db.execute(query.where(Watch.version > self._version))).all()
+                for row in rows:
+                    _add(self._watches, self._postings, *row)
+            else:
+                # Built separately so listings matched during the load still see the old index
+                watches, postings = {}, {}
+                for row in (await db.execute(query)).all():
+                    _add(watches, postings, *row)
+                self._watches, self._postings = watches, postings
+                self.stats["reloads"] += 1
+            self._version = version
+
+    def match(self, book: Book) -> list[tuple[int, int]]:
+        """(watch_id, user_id) of every watch the book satisfies, except its owner's."""
+        self.stats["checked"] += 1
+        candidates = set(self._postings.get((WatchKind.ISBN, normalize_isbn(book.isbn or "")), ()))
+        fields = {WatchKind.TITLE: set(words(book.title)), WatchKind.AUTHOR: set(words(book.author))}
+        for kind, field_words in fields.items():
+            for word in field_words:
+                for watch_id in self._postings.get((kind, word), ()):
+                    if self._watches[watch_id][2] <= field_words:
+                        candidates.add(watch_id)
+        matches = [
+            (watch_id, self._watches[watch_id][0]) for watch_id in candidates
+            if self._watches[watch_id][0] != book.owner_id
+        ]
+        self.stats["matched"] += len(matches)
+        return matches
+
+    def snapshot(self) -> dict:
+        return {"watches": len(self._watches), "keys": len(self._postings), "version": self._version, **self.stats}
+
+watch_index = WatchIndex()
+
+async def notify_watchers(books: Iterable[Book]) -> int:
+    """
+    Alerts the owners of every watch matching these newly AVAILABLE books
+    with a `watch` event, and stamps the watches' last match. Runs in its own
+    session, and failures are logged rather than raised: the listing itself
+    has already been committed.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            return await _notify_watchers(db, list(books))
+    except Exception:
+        logger.exception("Watch alerts failed")
+        return 0
+
+async def _notify_watchers(db: AsyncSession, books: list[Book]) -> int:
+    await watch_index.refresh(db)
+    now = datetime.now(timezone.utc)
+    alerts = []
+    for book in books:
+        matches = watch_index.match(book)
+        if not matches:
+            continue
+        await db.execute(
+            update(Watch)
+            .where(Watch.id.in_([watch_id for watch_id, _ in matches]))
+            .values(last_matched_book_id=book.id, last_matched_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        by_user: dict[int, list[int]] = {}
+        for watch_id, user_id in matches:
+            by_user.setdefault(user_id, []).append(watch_id)
+        summary = {"id": book.id, "title": book.title, "author": book.author, "isbn": book.isbn}
+        alerts.extend((user_id, {"book": summary, "watch_ids": watch_ids}) for user_id, watch_ids in by_user.items())
+    await db.commit()
+    for user_id, data in alerts:
+        event_bus.publish((user_id,), "watch", data)
+    return len(alerts)
@@ -1,11 +1,102 @@
+import json
+import threading
+from collections import OrderedDict
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+TIMEOUT = (5, 30) # (connect, read) seconds, unless a call passes its own
+POOL_SIZE = 10 # >= background.WORKERS, so parallel calls never wait for a connection
+MAX_CACHED_RESPONSES = 64
+
+class PooledAdapter(HTTPAdapter):
+    """Keep-alive connection pool that applies TIMEOUT to calls that don't set one."""
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout if timeout is not None else TIMEOUT, **kwargs)
+
+def make_session():
+    """
+    A requests.Session shared by every call: connections to the API host are
+    reused instead of re-handshaking TCP+TLS each time. GETs are retried with
+    backoff on connection errors and 502/503/504; other methods are only
+    retried if the connection failed before the request was sent.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = PooledAdapter(pool_connections=2, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # gzip/deflate, plus br/zstd when the matching decoder is installed
+    session.headers.update(make_headers(accept_encoding=True))
+    return session
 
 class BookLoopAPI:
     BASE_URL = "https://bookloop-api.onrender.com"
 
     def __init__(self):
+        self.session = make_session()
+        self._cache = OrderedDict() # (url, params) -> (etag, raw body, X-Next-Cursor)
+        self._cache_lock = threading.Lock() # calls run on background workers
         self.token = None
 
+    @property
+    def token(self):
+        return self._token
+
+    @token.setter
+    def token(self, token):
+        # Set once here rather than per call; the session adds it to every request
+        self._token = token
+        with self._cache_lock:
+            self._cache.clear() # Cached bodies belong to the previous user
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        else:
+            self.session.headers.pop("Authorization", None)
+
+    def _get_json(self, url, params=None):
+        """
+        GET that revalidates: the ETag of the last 200 for the same url and
+        params is sent as If-None-Match, and a 304 is answered from the cached
+        body, which is kept raw and parsed per call so callers can't alter it.
+        Returns (status_code, body, next_cursor); body is None unless 200.
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        response = self.session.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            with self._cache_lock:
+                if key in self._cache: self._cache.move_to_end(key)
+            return 200, json.loads(cached[1]), cached[2]
+        if response.status_code != 200:
+            return response.status_code, None, None
+
+        next_cursor = response.headers.get("X-Next-Cursor")
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._cache_lock:
+                self._cache[key] = (etag, response.content, next_cursor)
+                self._cache.move_to_end(key)
+                while len(self._cache) > MAX_CACHED_RESPONSES:
+                    self._cache.popitem(last=False)
+        return 200, response.json(), next_cursor
+
+    @classmethod
+    def cover_url(cls, book_id, size="small"):
+        """Server-side thumbnail of a book's cover (small is 50x75)."""
+        return f"{cls.BASE_URL}/books/{book_id}/cover?size={size}"
+
     def login(self, username, password):
         """
         Logs in the user and returns (success, message).
@@ -18,7 +109,7 @@ class BookLoopAPI:
             "password": password
         }
         try:
-            response = requests.post(url, data=data)
+            response = self.session.post(url, data=data)
             if response.status_code == 200:
                 self.token = response.json().get("access_token")
                 return True, self.token
@@ -42,7 +133,7 @@ class BookLoopAPI:
             "password": password
         }
         try:
-            response = requests.post(url, json=json_data)
+            response = self.session.post(url, json=json_data)
             if response.status_code == 200:
                 return True, "Registration successful"
             else:
@@ -59,14 +150,15 @@ class BookLoopAPI:
         Uploads a book using Smart Upload (ISBN only).
         """
         url = f"{self.BASE_URL}/books/"
-        headers = {"Authorization": f"Bearer {self.token}"}
         payload = {
             "isbn": isbn,
             "condition": condition
         }
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = self.session.post(url, json=payload)
             if response.status_code == 200:
+                if response.json().get("status") == "PENDING_METADATA":
+                    return True, "Book listed! Its details are being looked up and will appear shortly."
                 return True, "Book listed successfully!"
             elif response.status_code == 404:
                 return False, "Book not found."
@@ -77,19 +169,93 @@ class BookLoopAPI:
         except requests.RequestException as e:
             return False, f"Connection error: {e}"
 
-    def get_books(self):
+    def get_metadata_job(self, book_id, wait=0):
         """
-        Fetches all books. Returns a list of dicts.
+        State of a PENDING_METADATA book's background lookup (QUEUED, RUNNING,
+        DONE, NOT_FOUND or DEAD). With wait > 0 the server holds the request
+        until the lookup finishes or `wait` seconds pass. Returns None if the
+        book has no lookup; a lookup that finds nothing removes the book.
         """
-        url = f"{self.BASE_URL}/books"
+        url = f"{self.BASE_URL}/books/{book_id}/metadata"
         try:
-            response = requests.get(url)
+            response = self.session.get(url, params={"wait": wait}, timeout=wait + 10)
             if response.status_code == 200:
                 return response.json()
+            return None
+        except requests.RequestException:
+            return None
+
+    def retry_metadata_job(self, book_id):
+        url = f"{self.BASE_URL}/books/{book_id}/metadata/retry"
+        try:
+            response = self.session.post(url)
+            if response.status_code == 200:
+                return True, "Lookup queued again"
+            try: detail = response.json().get("detail", "Retry failed")
+            except: detail = f"Retry failed: {response.status_code}"
+            return False, detail
+        except requests.RequestException as e:
+            return False, f"Connection error: {e}"
+
+    def upload_books_batch(self, items):
+        """
+        Lists many books at once. `items` is a list of {"isbn", "condition"} dicts.
+        Returns (success, result) where result is the server's per-item report
+        on success, or an error message.
+        """
+        url = f"{self.BASE_URL}/books/batch"
+        try:
+            response = self.session.post(url, json={"items": items})
+            if response.status_code == 200:
+                return True, response.json()
             elif response.status_code == 401:
-                return 401
+                return False, "Unauthorized"
+            else:
+                try: detail = response.json().get("detail", "Batch upload failed")
+                except: detail = f"Batch upload failed: {response.status_code}"
+                return False, detail
+        except requests.RequestException as e:
+            return False, f"Connection error: {e}"
+
+    def get_books_page(self, cursor=None, limit=100, **filters):
+        """
+        Fetches one page of books matching the given server-side filters
+        (owner_id, exclude_owner_id, author, title_prefix, status, order_by).
+        Returns (books, next_cursor); next_cursor is None on the last page.
+        """
+        url = f"{self.BASE_URL}/books/"
+        params = {k: v for k, v in filters.items() if v is not None}
+        params["limit"] = limit
+        if cursor:
+            params["cursor"] = cursor
+        try:
+            status_code, books, next_cursor = self._get_json(url, params)
+            if status_code == 200:
+                return books, next_cursor
+            elif status_code == 401:
+                return 401, None
             else:
-                return []
+                return [], None
+        except requests.RequestException:
+            return [], None
+
+    def get_books(self, **filters):
+        """
+        Fetches the first page of books. Returns a list of dicts.
+        """
+        books, _ = self.get_books_page(**filters)
+        return books
+
+    def search_books(self, query, limit=20):
+        """
+        Ranked search over title, author and ISBN. Returns a list of dicts.
+        """
+        url = f"{self.BASE_URL}/books/search"
+        try:
+            response = self.session.get(url, params={"q": query, "limit": limit})
+            if response.status_code == 200:
+                return response.json()
+            return []
         except requests.RequestException:
             return []
 
@@ -97,12 +263,11 @@ class BookLoopAPI:
         """Fetches current user info"""
         if not self.token: return None
         url = f"{self.BASE_URL}/auth/me"
-        headers = {"Authorization": f"Bearer {self.token}"}
         try:
-           response = requests.get(url, headers=headers)
-           if response.status_code == 200:
-               return response.json()
-           elif response.status_code == 401:
+           status_code, me, _ = self._get_json(url)
+           if status_code == 200:
+               return me
+           elif status_code == 401:
                return 401 # Signal to logout
            return None
         except:
@@ -111,14 +276,13 @@ class BookLoopAPI:
     def update_profile(self, email=None, password=None, old_password=None):
         """Updates user profile (email/password)"""
         url = f"{self.BASE_URL}/auth/me"
-        headers = {"Authorization": f"Bearer {self.token}"}
         data = {}
         if email: data["email"] = email
         if password: data["password"] = password
         if old_password: data["old_password"] = old_password
 
         try:
-            response = requests.put(url, json=data, headers=headers)
+            response = self.session.put(url, json=data)
             if response.status_code == 200:
                 return True, "Profile updated successfully"
             else:
@@ -128,15 +292,67 @@ class BookLoopAPI:
         except requests.RequestException as e:
             return False, str(e)
 
-    def get_my_swaps(self):
+    def get_my_swaps(self, status=None):
         """
-        Fetches user's transactions (incoming & outgoing).
+        Fetches user's transactions (incoming & outgoing), with book titles
+        and usernames expanded. `status` may be a single status or a list.
         """
         if not self.token: return []
         url = f"{self.BASE_URL}/transactions/my-swaps"
-        headers = {"Authorization": f"Bearer {self.token}"}
+        params = {"status": tuple(status) if isinstance(status, list) else status} if status else None
         try:
-            response = requests.get(url, headers=headers)
+            status_code, swaps, _ = self._get_json(url, params)
+            if status_code == 200:
+                return swaps
+            elif status_code == 401:
+                return 401
+            return []
+        except requests.RequestException:
+            return []
+
+    def get_wishes(self):
+        """The current user's wishlist (list of {"id", "isbn", "created_at"})."""
+        if not self.token: return []
+        try:
+            response = self.session.get(f"{self.BASE_URL}/wishes/")
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 401:
+                return 401
+            return []
+        except requests.RequestException:
+            return []
+
+    def add_wish(self, isbn):
+        """
+        Wishes for any copy of an ISBN. The server may match it into a trade
+        cycle, which then shows up among the swaps. Returns (success, message).
+        """
+        try:
+            response = self.session.post(f"{self.BASE_URL}/wishes/", json={"isbn": isbn})
+            if response.status_code == 200:
+                return True, "Added to your wishlist"
+            try: detail = response.json().get("detail", "Could not add wish")
+            except: detail = f"Could not add wish: {response.status_code}"
+            return False, detail
+        except requests.RequestException as e:
+            return False, str(e)
+
+    def remove_wish(self, isbn):
+        """Returns (success, message)"""
+        try:
+            response = self.session.delete(f"{self.BASE_URL}/wishes/{isbn}")
+            if response.status_code == 204:
+                return True, "Removed from your wishlist"
+            return False, f"Could not remove wish: {response.status_code}"
+        except requests.RequestException as e:
+            return False, str(e)
+
+    def get_watches(self):
+        """The current user's watches (list of {"id", "kind", "value", "last_matched_at", ...})."""
+        if not self.token: return []
+        try:
+            response = self.session.get(f"{self.BASE_URL}/watches/")
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 401:
@@ -145,16 +361,40 @@ class BookLoopAPI:
         except requests.RequestException:
             return []
 
+    def add_watch(self, kind, value):
+        """
+        Watches for new listings; kind is "ISBN", "AUTHOR" or "TITLE". Matches
+        arrive as "watch" events on the event stream. Returns (success, message).
+        """
+        try:
+            response = self.session.post(f"{self.BASE_URL}/watches/", json={"kind": kind, "value": value})
+            if response.status_code == 200:
+                return True, "Watching for new listings"
+            try: detail = response.json().get("detail", "Could not add watch")
+            except: detail = f"Could not add watch: {response.status_code}"
+            return False, detail
+        except requests.RequestException as e:
+            return False, str(e)
+
+    def remove_watch(self, watch_id):
+        """Returns (success, message)"""
+        try:
+            response = self.session.delete(f"{self.BASE_URL}/watches/{watch_id}")
+            if response.status_code == 204:
+                return True, "Watch removed"
+            return False, f"Could not remove watch: {response.status_code}"
+        except requests.RequestException as e:
+            return False, str(e)
+
     def request_book(self, book_id, offered_book_id=None):
         """Returns (success, message)"""
         url = f"{self.BASE_URL}/transactions/request"
-        headers = {"Authorization": f"Bearer {self.token}"}
         payload = {"book_id": book_id}
         if offered_book_id:
             payload["offered_book_id"] = offered_book_id
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = self.session.post(url, json=payload)
             if response.status_code == 200:
                 return True, "Request sent successfully"
             else:
@@ -167,9 +407,8 @@ class BookLoopAPI:
     def accept_request(self, tx_id):
         """Returns (success, message)"""
         url = f"{self.BASE_URL}/transactions/{tx_id}/accept"
-        headers = {"Authorization": f"Bearer {self.token}"}
         try:
-            response = requests.put(url, headers=headers)
+            response = self.session.put(url)
             if response.status_code == 200:
                 return True, "Request accepted"
             else:
@@ -180,10 +419,9 @@ class BookLoopAPI:
     def ship_book(self, tx_id, tracking_number):
         """Returns (success, message)"""
         url = f"{self.BASE_URL}/transactions/{tx_id}/ship"
-        headers = {"Authorization": f"Bearer {self.token}"}
         data = {"tracking_number": tracking_number}
         try:
-            response = requests.put(url, json=data, headers=headers)
+            response = self.session.put(url, json=data)
             if response.status_code == 200:
                 return True, "Book marked as shipped"
             else:
@@ -194,9 +432,8 @@ class BookLoopAPI:
     def confirm_receipt(self, tx_id):
         """Returns (success, message)"""
         url = f"{self.BASE_URL}/transactions/{tx_id}/confirm"
-        headers = {"Authorization": f"Bearer {self.token}"}
         try:
-            response = requests.put(url, headers=headers)
+            response = self.session.put(url)
             if response.status_code == 200:
                 return True, "Receipt confirmed"
             else:
@@ -204,26 +441,48 @@ class BookLoopAPI:
         except requests.RequestException as e:
             return False, str(e)
 
-    def get_market_books(self):
+    def get_market_books(self, user_id=None):
         """
-        Fetches all available books. (Filtering happens in UI)
+        Fetches available books listed by other users.
         """
-        return self.get_books()
+        return self.get_books(exclude_owner_id=user_id)
 
-    def get_my_available_books(self):
+    def get_market_books_page(self, user_id=None, cursor=None, limit=100):
         """
-        Fetches available books. (Filtering happens in UI)
+        One page of available books listed by other users. Returns (books, next_cursor).
         """
-        return self.get_books()
+        return self.get_books_page(cursor=cursor, limit=limit, exclude_owner_id=user_id)
 
-    def get_market_books(self):
+    def get_my_books(self, status=None, cursor=None, limit=100):
         """
-        Fetches all available books. (Filtering happens in UI)
+        Fetches the current user's own books (all statuses unless one is given).
+        Returns a list of dicts, or 401.
         """
-        return self.get_books()
+        books, _ = self.get_my_books_page(status=status, cursor=cursor, limit=limit)
+        return books
+
+    def get_my_books_page(self, status=None, cursor=None, limit=100):
+        """
+        One page of the current user's own books. Returns (books, next_cursor);
+        books is 401 if the session expired.
+        """
+        if not self.token: return [], None
+        url = f"{self.BASE_URL}/books/mine"
+        params = {"limit": limit}
+        if status: params["status"] = status
+        if cursor: params["cursor"] = cursor
+        try:
+            status_code, books, next_cursor = self._get_json(url, params)
+            if status_code == 200:
+                return books, next_cursor
+            elif status_code == 401:
+                return 401, None
+            return [], None
+        except requests.RequestException:
+            return [], None
 
     def get_my_available_books(self):
         """
-        Fetches available books. (Filtering happens in UI)
+        Fetches the current user's AVAILABLE books (the ones that can be offered).
         """
-        return self.get_books()
+        return self.get_my_books(status="AVAILABLE")
@@ -0,0 +1,130 @@
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = 6
+PUMP_MS = 30
+
+class Call:
+    """
+    Handle for one submit(). cancel() only drops this caller's callbacks: the
+    HTTP request itself can't be aborted once a worker has picked it up.
+    """
+
+    def __init__(self, runner, key, widget, on_done, on_error, channel):
+        self.runner = runner
+        self.key = key
+        self.widget = widget
+        self.on_done = on_done
+        self.on_error = on_error
+        self.channel = channel
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.runner._detach(self)
+
+class BackgroundCalls:
+    """
+    Runs blocking BookLoopAPI calls on a worker pool so the Tk main loop never
+    waits on the network. Results are delivered on the main thread through a
+    short after() loop that only runs while calls are pending.
+
+    - Identical calls (same function and arguments) that are in flight at the
+      same time share one request.
+    - Submitting on a `channel` supersedes the previous call on that channel:
+      its callbacks are dropped, so a slow stale refresh can't overwrite a
+      newer one.
+    - Callbacks are skipped if their widget was destroyed in the meantime.
+    """
+
+    def __init__(self, workers=WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self._inflight = {} # key -> (future, [Call])
+        self._channels = {} # channel -> Call
+        self._done = queue.Queue()
+        self._pump_widget = None
+
+    def submit(self, widget, fn, *args, on_done=None, on_error=None, channel=None, **kwargs):
+        """Runs fn(*args, **kwargs) on a worker; on_done(result) / on_error(exc) run on the main thread."""
+        key = (fn, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            key = object() # Unhashable arguments: no deduplication
+
+        call = Call(self, key, widget, on_done, on_error, channel)
+        if channel is not None:
+            previous = self._channels.get(channel)
+            if previous is not None:
+                previous.cancel()
+            self._channels[channel] = call
+
+        entry = self._inflight.get(key)
+        if entry is not None:
+            entry[1].append(call)
+        else:
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._inflight[key] = (future, [call])
+            future.add_done_callback(lambda f, key=key: self._done.put((key, f)))
+        if self._pump_widget is None:
+            # The root lives as long as the app; a dialog would take the pending after() with it when closed
+            self._pump_widget = widget._root()
+            self._pump_widget.after(PUMP_MS, self._pump)
+        return call
+
+    def cancel(self, channel):
+        call = self._channels.get(channel)
+        if call is not None:
+            call.cancel()
+
+    def _detach(self, call):
+        if self._channels.get(call.channel) is call:
+            del self._channels[call.channel]
+        entry = self._inflight.get(call.key)
+        if entry is None:
+            return
+        future, calls = entry
+        if call in calls:
+            calls.remove(call)
+        # Nobody wants the result any more; skip the request if it hasn't started
+        if not calls and future.cancel():
+            del self._inflight[call.key]
+
+    def _pump(self):
+        while True:
+            try:
+                key, future = self._done.get_nowait()
+            except queue.Empty:
+                break
+            entry = self._inflight.get(key)
+            if entry is None or entry[0] is not future:
+                continue
+            del self._inflight[key]
+            if future.cancelled():
+                continue
+            error = future.exception()
+            for call in entry[1]:
+                if self._channels.get(call.channel) is call:
+                    del self._channels[call.channel]
+                try:
+                    if not call.widget.winfo_exists(): continue
+                except Exception:
+                    continue
+                try:
+                    if error is None:
+                        if call.on_done: call.on_done(future.result())
+                    elif call.on_error:
+                        call.on_error(error)
+                    else:
+                        print(f"Background call failed: {error!r}")
+                except Exception:
+                    traceback.print_exc()
+
+        if self._inflight:
+            self._pump_widget.after(PUMP_MS, self._pump)
+        else:
+            self._pump_widget = None
+
+background = BackgroundCalls()
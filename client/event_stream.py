@@ -0,0 +1,140 @@
+import json
+import queue
+import threading
+import traceback
+
+import requests
+
+PUMP_MS = 100
+READ_TIMEOUT = 45 # The server sends a keep-alive every 15s
+MAX_BACKOFF = 60
+
+class EventStream:
+    """
+    Keeps GET /events (Server-Sent Events) open on a daemon thread while the
+    user is logged in, reconnecting with backoff when it drops. Events are
+    handed to listeners on the Tk main thread as callback(event_type, data).
+
+    After a reconnect, listeners get a "resync" event: anything published
+    while the stream was down was missed, so they should reload.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.connected = False
+        self._listeners = [] # [(widget, callback)]
+        self._events = queue.Queue()
+        self._thread = None
+        self._stop = None
+        self._response = None
+        self._pump_widget = None
+
+    def listen(self, widget, callback):
+        self._listeners.append((widget, callback))
+
+    def start(self, widget):
+        """Starts streaming for the current api.token; widget hosts the after() pump."""
+        self.stop()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="event-stream", daemon=True)
+        self._thread.start()
+        if self._pump_widget is None:
+            self._pump_widget = widget.winfo_toplevel()
+            self._pump_widget.after(PUMP_MS, self._pump)
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        response = self._response
+        if response is not None:
+            # Unblocks the worker's read
+            try: response.close()
+            except Exception: pass
+        self._thread = None
+        self._stop = None
+        self.connected = False
+
+    def _run(self, stop):
+        # Worker thread: no Tk calls here
+        backoff = 1
+        first = True
+        while not stop.is_set():
+            try:
+                response = self.api.session.get(f"{self.api.BASE_URL}/events", stream=True,
+                                                timeout=(5, READ_TIMEOUT), headers={"Accept": "text/event-stream"})
+                if response.status_code == 401:
+                    self._events.put((stop, "unauthorized", {}))
+                    return
+                if response.status_code != 200:
+                    response.close()
+                    raise requests.RequestException(f"Event stream answered {response.status_code}")
+                self._response = response
+                if stop.is_set():
+                    response.close()
+                    return
+                self._events.put((stop, "connected", {}))
+                if not first:
+                    self._events.put((stop, "resync", {}))
+                first = False
+                backoff = 1
+                self._read(response, stop)
+            except Exception:
+                pass
+            finally:
+                self._response = None
+            if stop.is_set():
+                return
+            self._events.put((stop, "disconnected", {}))
+            stop.wait(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def _read(self, response, stop):
+        event_type, data = "message", []
+        for line in response.iter_lines(decode_unicode=True):
+            if stop.is_set():
+                return
+            if line is None:
+                continue
+            if not line:
+                # Blank line ends an event
+                if data:
+                    try:
+                        self._events.put((stop, event_type, json.loads("\n".join(data))))
+                    except ValueError:
+                        pass
+                event_type, data = "message", []
+            elif line.startswith(":"):
+                continue # Keep-alive comment
+            else:
+                field, _, value = line.partition(":")
+                value = value.removeprefix(" ")
+                if field == "event": event_type = value
+                elif field == "data": data.append(value)
+
+    def _pump(self):
+        while True:
+            try:
+                stop, event_type, data = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if stop is not self._stop:
+                continue # From a stream that has since been stopped
+            if event_type == "connected":
+                self.connected = True
+                continue
+            if event_type == "disconnected":
+                self.connected = False
+                continue
+            for widget, callback in list(self._listeners):
+                try:
+                    if not widget.winfo_exists():
+                        self._listeners.remove((widget, callback))
+                        continue
+                    callback(event_type, data)
+                except Exception:
+                    traceback.print_exc()
+
+        if self._stop is not None or not self._events.empty():
+            self._pump_widget.after(PUMP_MS, self._pump)
+        else:
+            self._pump_widget = None
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import customtkinter as ctk
+import requests
+from PIL import Image
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "bookloop", "images")
+MAX_DISK_BYTES = 100 * 1024 * 1024
+MAX_MEMORY_IMAGES = 512
+WORKERS = 4
+PUMP_MS = 30
+
+class DiskCache:
+    """Image bytes keyed by sha256(url); least recently read files go first once over max_bytes."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None # name -> size, least recently used first
+        self._total = 0
+
+    def _index(self):
+        if self._entries is None:
+            os.makedirs(self.directory, exist_ok=True)
+            found = sorted((e.stat().st_mtime, e.name, e.stat().st_size) for e in os.scandir(self.directory) if e.is_file())
+            self._entries = OrderedDict((name, size) for _, name, size in found)
+            self._total = sum(self._entries.values())
+        return self._entries
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def get(self, url):
+        name = self.key(url)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._index():
+                return None
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                self._total -= self._entries.pop(name)
+                return None
+            self._entries.move_to_end(name)
+        return data
+
+    def put(self, url, data):
+        name = self.key(url)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            entries = self._index()
+            try:
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+            except OSError:
+                return
+            self._total += len(data) - entries.pop(name, 0)
+            entries[name] = len(data)
+            while self._total > self.max_bytes and len(entries) > 1:
+                old, size = entries.popitem(last=False)
+                self._total -= size
+                try: os.remove(os.path.join(self.directory, old))
+                except OSError: pass
+
+class ImageLoader:
+    """
+    Loads images for widgets without blocking the Tk main loop.
+
+    Downloads and decoding run on a fixed pool of WORKERS threads; concurrent
+    requests for the same URL share one download. Raw bytes are kept in a
+    DiskCache and decoded CTkImages in an in-memory LRU, so re-rendering a
+    screen costs no network traffic. Results are handed back on the main
+    thread by a short after() loop that only runs while work is pending.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_disk_bytes=MAX_DISK_BYTES, max_memory_images=MAX_MEMORY_IMAGES, workers=WORKERS):
+        self.disk = DiskCache(cache_dir, max_disk_bytes)
+        self.max_memory_images = max_memory_images
+        self._memory = OrderedDict() # (url, size) -> CTkImage
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-loader")
+        self._session = requests.Session()
+        self._waiting = {} # url -> [(widget, size, callback)]
+        self._done = queue.Queue()
+        self._pump_widget = None
+
+    def load(self, widget, url, size, callback):
+        """
+        Calls callback(ctk_image) on the main thread once the image at url is
+        ready, scaled to size; never called if widget is gone by then or the
+        image can't be loaded. Must itself be called on the main thread.
+        """
+        image = self._memory.get((url, size))
+        if image is not None:
+            self._memory.move_to_end((url, size))
+            callback(image)
+            return
+
+        waiters = self._waiting.get(url)
+        if waiters is not None:
+            waiters.append((widget, size, callback))
+            return
+        self._waiting[url] = [(widget, size, callback)]
+        self._executor.submit(self._fetch, url)
+        if self._pump_widget is None:
+            self._pump_widget = widget._root()
+            self._pump_widget.after(PUMP_MS, self._pump)
+
+    def _fetch(self, url):
+        # Worker thread: no Tk calls here
+        image = None
+        try:
+            data = self.disk.get(url)
+            if data is None:
+                response = self._session.get(url, timeout=10)
+                if response.status_code == 200:
+                    data = response.content
+                    self.disk.put(url, data)
+            if data is not None:
+                image = Image.open(BytesIO(data))
+                image.load()
+        except Exception:
+            image = None # Silently fail for image errors
+        self._done.put((url, image))
+
+    def _pump(self):
+        while True:
+            try:
+                url, image = self._done.get_nowait()
+            except queue.Empty:
+                break
+            for widget, size, callback in self._waiting.pop(url, []):
+                if image is None:
+                    continue
+                try:
+                    if not widget.winfo_exists(): continue
+                    callback(self._ctk_image(url, size, image))
+                except Exception:
+                    pass
+
+        if self._waiting:
+            self._pump_widget.after(PUMP_MS, self._pump)
+        else:
+            self._pump_widget = None
+
+    def _ctk_image(self, url, size, image):
+        ctk_img = self._memory.get((url, size))
+        if ctk_img is None:
+            ctk_img = ctk.CTkImage(light_image=image, dark_image=image, size=size)
+            self._memory[(url, size)] = ctk_img
+            if len(self._memory) > self.max_memory_images:
+                self._memory.popitem(last=False)
+        return ctk_img
+
+images = ImageLoader()
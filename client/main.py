@@ -3,6 +3,8 @@ import keyring
 import os
 import sys
 from api_client import BookLoopAPI
+from background import background
+from event_stream import EventStream
 from ui.dashboard_screen import DashboardScreen
 from ui.login_screen import LoginScreen
 from ui.register_screen import RegisterScreen
@@ -41,6 +43,9 @@ class BookLoopApp(ctk.CTk):
         # API Client
         self.api = BookLoopAPI()
         self.token = None
+        # Push channel for swap updates while logged in
+        self.events = EventStream(self.api)
+        self.events.listen(self, self.on_stream_event)
 
         # Container for screens
         self.container = ctk.CTkFrame(self)
@@ -54,11 +59,9 @@ class BookLoopApp(ctk.CTk):
         # Initialize screens
         self.init_frames()
 
-        # Try to load session
-        if self.load_session():
-            self.show_dashboard()
-        else:
-            self.show_frame("LoginScreen")
+        # Try to load session; the login screen shows until the token is verified
+        self.show_frame("LoginScreen")
+        self.load_session()
 
     def init_frames(self):
         # We only create LoginScreen and RegisterScreen initially. Dashboard requires login.
@@ -73,6 +76,9 @@ class BookLoopApp(ctk.CTk):
     def show_frame(self, page_name):
         frame = self.frames[page_name]
         frame.tkraise()
+        if page_name == "SwapsScreen" and self.events.connected and frame.my_id is not None:
+            # Already loaded and kept current by the event stream
+            return
         if page_name == "SwapsScreen" or page_name == "DashboardScreen":
              # Refresh data if possible
              if hasattr(frame, "load_data"):
@@ -82,6 +88,10 @@ class BookLoopApp(ctk.CTk):
                  frame.load_books()
 
     def on_login_success(self):
+        # Screens from a previous session would keep listening for events
+        for name in ("DashboardScreen", "SwapsScreen"):
+            if name in self.frames: self.frames.pop(name).destroy()
+
         # Create DashboardScreen now that we are logged in
         dashboard_frame = DashboardScreen(self.container)
         self.frames["DashboardScreen"] = dashboard_frame
@@ -93,6 +103,11 @@ class BookLoopApp(ctk.CTk):
         swaps_frame.grid(row=0, column=0, sticky="nsew")
 
         self.show_frame("DashboardScreen")
+        self.events.start(self)
+
+    def on_stream_event(self, event_type, data):
+        if event_type == "unauthorized":
+            self.logout()
 
     def on_go_to_register(self):
         self.show_frame("RegisterScreen")
@@ -125,23 +140,27 @@ class BookLoopApp(ctk.CTk):
             if token:
                 self.token = token
                 self.api.token = token
-                # Verify token validity by calling /me
-                user = self.api.get_me()
-                if user:
-                    self.on_login_success() # Setup dashboard frames
-                    return True
-                else:
-                    return False
+                # Verify token validity by calling /me, without blocking the window
+                background.submit(self, self.api.get_me, on_done=self.on_session_checked)
+                return True
         except Exception as e:
             print(f"Failed to load session: {e}")
             return False
         return False
 
+    def on_session_checked(self, user):
+        if user and user != 401:
+            self.on_login_success() # Setup dashboard frames
+        else:
+            self.token = None
+            self.api.token = None
+
     def logout(self):
         try:
             keyring.delete_password(SERVICE_ID, USER_KEY)
         except:
             pass
+        self.events.stop()
         self.token = None
         self.api.token = None
         # Clean up frames if needed
@@ -1,17 +1,29 @@
 import customtkinter as ctk
-from PIL import Image
-import requests
-from io import BytesIO
-from threading import Thread
+from api_client import BookLoopAPI
+from background import background
+from image_loader import images
 from ui.swap_dialog import SwapOfferDialog
 from ui.upload_dialog import UploadDialog
+from ui.virtual_list import VirtualList
+
+LOOKUP_POLL_MS = 3000
+PAGE_SIZE = 50
+ROW_HEIGHT = 125
 
 class BookCard(ctk.CTkFrame):
-    def __init__(self, master, book, user_id, on_swap):
+    """
+    One row of a book list. show() points the card at another book, so the
+    lists can recycle a handful of cards instead of building one per book.
+    """
+    def __init__(self, master, on_swap, is_mine, lookups=None, on_retry_lookup=None, wishes=None, on_wish=None):
         super().__init__(master, corner_radius=10, border_width=1, border_color="gray30", bg_color="transparent")
-        self.book = book
-        self.user_id = user_id
+        self.book = None
         self.on_swap = on_swap
+        self.is_mine = is_mine
+        self.lookups = lookups if lookups is not None else {}
+        self.on_retry_lookup = on_retry_lookup
+        self.wishes = wishes if wishes is not None else set() # ISBNs on the user's wishlist
+        self.on_wish = on_wish
 
         self.grid_columnconfigure(1, weight=1)
 
@@ -19,63 +31,95 @@ class BookCard(ctk.CTkFrame):
         self.image_label = ctk.CTkLabel(self, text="📖", font=("Arial", 30))
         self.image_label.grid(row=0, column=0, rowspan=2, padx=15, pady=15)
 
-        if book.get("image_url"):
-            self.load_image(book["image_url"])
-
         # Info
-        ctk.CTkLabel(self, text=book["title"], font=("Roboto", 18, "bold"), anchor="w").grid(row=0, column=1, padx=5, pady=(15, 0), sticky="w")
-        ctk.CTkLabel(self, text=f"by {book['author']}", font=("Roboto", 14), text_color="gray70", anchor="w").grid(row=1, column=1, padx=5, pady=(0, 15), sticky="nw")
-
-        # Button
-        if book['owner_id'] != user_id:
-            ctk.CTkButton(
-                self,
-                text="Swap Request",
-                command=lambda: self.on_swap(book['id']),
-                width=120,
-                height=30,
-                fg_color="#2CC985",
-                hover_color="#229C68"
-            ).grid(row=0, column=2, rowspan=2, padx=20, sticky="e")
+        self.title_label = ctk.CTkLabel(self, text="", font=("Roboto", 18, "bold"), anchor="w")
+        self.title_label.grid(row=0, column=1, padx=5, pady=(15, 0), sticky="w")
+        self.byline_label = ctk.CTkLabel(self, text="", font=("Roboto", 14), text_color="gray70", anchor="w")
+        self.byline_label.grid(row=1, column=1, padx=5, pady=(0, 15), sticky="nw")
+
+        # Button, or a status label for your own books
+        self.action_button = ctk.CTkButton(self, text="", width=120, height=30)
+        self.action_button.grid(row=0, column=2, rowspan=2, padx=20, sticky="e")
+        self.owner_label = ctk.CTkLabel(self, text="", text_color="gray")
+        self.owner_label.grid(row=0, column=2, rowspan=2, padx=20, sticky="e")
+        # Wishlist toggle; wished ISBNs can be matched into multi-party trades
+        self.wish_button = ctk.CTkButton(self, text="", width=90, height=30, fg_color="transparent", border_width=1)
+        self.wish_button.grid(row=0, column=3, rowspan=2, padx=(0, 20), sticky="e")
+
+    def show(self, book):
+        self.book = book
+        # `lookup` is the dead-lettered metadata job, if the lookup gave up
+        lookup = self.lookups.get(book['id'])
+
+        self.image_label.configure(image=None, text="📖")
+        if book.get("image_url"):
+            images.load(self.image_label, BookLoopAPI.cover_url(book["id"]), (50, 75),
+                        lambda img, book_id=book['id']: self.set_image(book_id, img))
+
+        self.title_label.configure(text=book["title"])
+        byline = f"by {book['author']}"
+        if book.get('status') == 'PENDING_METADATA':
+            byline = (lookup.get('last_error') or "Lookup failed") if lookup else "Looking up book details..."
+        self.byline_label.configure(text=byline)
+
+        if lookup and lookup.get('state') == 'DEAD' and self.on_retry_lookup:
+            self.action_button.configure(text="Retry Lookup", command=lambda: self.on_retry_lookup(book['id']),
+                                         fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"],
+                                         hover_color=ctk.ThemeManager.theme["CTkButton"]["hover_color"])
+            self.action_button.grid()
+            self.owner_label.grid_remove()
+        elif not self.is_mine(book):
+            self.action_button.configure(text="Swap Request", command=lambda: self.on_swap(book['id']),
+                                         fg_color="#2CC985", hover_color="#229C68")
+            self.action_button.grid()
+            self.owner_label.grid_remove()
+        else:
+             status = book.get('status', 'AVAILABLE')
+             if status == 'AVAILABLE':
+                 label = "Your Book"
+             elif status == 'PENDING_METADATA':
+                 label = "Your Book (Not Listed)" if lookup else "Your Book (Fetching Details)"
+             else:
+                 label = f"Your Book ({status.title()})"
+             self.owner_label.configure(text=label)
+             self.owner_label.grid()
+             self.action_button.grid_remove()
+
+        if self.on_wish and book.get('isbn') and not self.is_mine(book):
+            wished = book['isbn'] in self.wishes
+            self.wish_button.configure(text="♥ Wanted" if wished else "♡ Want", command=lambda: self.on_wish(book))
+            self.wish_button.grid()
         else:
-             ctk.CTkLabel(self, text="Your Book", text_color="gray").grid(row=0, column=2, rowspan=2, padx=20, sticky="e")
-
-    def load_image(self, url):
-        def _load():
-            try:
-                if not url: return
-                response = requests.get(url, timeout=5)
-                if response.status_code == 200:
-                    img_data = BytesIO(response.content)
-                    pil_img = Image.open(img_data)
-                    # Resize locally
-                    pil_img = pil_img.resize((50, 75))
-
-                    # Schedule update on main thread, passing PIL image
-                    # Check if widget still exists before scheduling
-                    if self.winfo_exists():
-                        self.after(0, lambda: self.update_image(pil_img))
-            except Exception:
-                pass # Silently fail for image errors
-
-        Thread(target=_load, daemon=True).start()
-
-    def update_image(self, pil_img):
-        # Create CTkImage on MAIN THREAD
-        try:
-           if not self.winfo_exists(): return
-           ctk_img = ctk.CTkImage(light_image=pil_img, dark_image=pil_img, size=(50, 75))
-           self.image_label.configure(image=ctk_img, text="")
-        except Exception:
-           pass
+            self.wish_button.grid_remove()
+
+    def set_image(self, book_id, ctk_img):
+        # The card may have been recycled onto another book while the image loaded
+        if self.book and self.book['id'] == book_id:
+            self.image_label.configure(image=ctk_img, text="")
+
+def book_label(book, book_id):
+    """'Title by Author' from an expanded swap book, falling back to the ID."""
+    if book:
+        return f"{book['title']} by {book['author']}"
+    return f"#{book_id}"
 
 class OfferCard(ctk.CTkFrame):
     def __init__(self, master, tx, user_id, on_accept, on_ship, on_confirm):
         super().__init__(master, corner_radius=10, border_width=1, border_color="gray30", bg_color="transparent")
-        self.tx = tx
         self.user_id = user_id
+        self.on_accept = on_accept
+        self.on_ship = on_ship
+        self.on_confirm = on_confirm
 
         self.grid_columnconfigure(1, weight=1)
+        self.show(tx)
+
+    def show(self, tx):
+        """(Re)builds the card for tx; called again when a swap event changes it."""
+        for w in self.winfo_children(): w.destroy()
+        self.tx = tx
+        user_id = self.user_id
+        on_accept, on_ship, on_confirm = self.on_accept, self.on_ship, self.on_confirm
 
         # Status Icon
         status_icon = "⏳"
@@ -85,17 +129,14 @@ class OfferCard(ctk.CTkFrame):
 
         ctk.CTkLabel(self, text=status_icon, font=("Arial", 25)).grid(row=0, column=0, rowspan=2, padx=15)
 
-        # Details
-        # We need to handle "Direct Swap" vs "Point Swap" details
-        # For now, simplistic view:
-        # If I am receiver: "Request for [Book ID]" (Wait, transaction schema has book_id)
-        # We need book title possibly? The schema returns IDs.
-        # For MVP, we'll just show IDs or "Book #ID".
-        # Ideally, backend should expand book details, but let's stick to what we have.
-
-        info_text = f"Swap #{tx['id']} - {tx['status']}\nTarget Book: {tx['book_id']}"
+        # Details ("Direct Swap" shows the offered book, "Point Swap" doesn't)
+        info_text = f"Swap #{tx['id']} - {tx['status']}\nTarget Book: {book_label(tx.get('book'), tx['book_id'])}"
+        if tx.get('cycle_id'):
+            info_text += f"\nPart of trade cycle #{tx['cycle_id']} (matched from your wishlist)"
         if tx.get('offered_book_id'):
-            info_text += f"\nOffered Book: {tx['offered_book_id']}"
+            info_text += f"\nOffered Book: {book_label(tx.get('offered_book'), tx['offered_book_id'])}"
+        if tx.get('counterparty_username'):
+            info_text += f"\nWith: {tx['counterparty_username']}"
 
         role = "Outgoing" if tx['receiver_id'] == user_id else "Incoming"
         # Wait, if I am receiver, I REQUESTED the book?
@@ -133,6 +174,11 @@ class DashboardScreen(ctk.CTkFrame):
         super().__init__(master)
         self.api = api
         self.user_id = int(user_id) if user_id is not None else None
+        self.failed_lookups = {} # book_id -> dead-lettered metadata job
+        self.lookup_poll = None
+        self.loading = set() # channels of fetches still waiting on the server
+        self.offer_cards = {} # tx id -> OfferCard
+        self.wishes = set() # ISBNs on the wishlist, shared with the market cards
 
         if not self.api and hasattr(master.winfo_toplevel(), 'api'):
              self.api = master.winfo_toplevel().api
@@ -166,6 +212,13 @@ class DashboardScreen(ctk.CTkFrame):
         self.logout_button = ctk.CTkButton(self.sidebar_frame, text="Logout", command=self.logout_event, fg_color="transparent", border_width=1, text_color=("red", "red"))
         self.logout_button.grid(row=6, column=0, padx=20, pady=20, sticky="s")
 
+        self.loading_label = ctk.CTkLabel(self.sidebar_frame, text="", text_color="gray70")
+        self.loading_label.grid(row=7, column=0, padx=20, pady=(0, 10))
+
+        # Latest watch alert; see on_event
+        self.alert_label = ctk.CTkLabel(self.sidebar_frame, text="", text_color="#2CC985", wraplength=160, justify="left")
+        self.alert_label.grid(row=8, column=0, padx=20, pady=(0, 10))
+
         # Main Content
         self.tabview = ctk.CTkTabview(self)
         self.tabview.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
@@ -175,11 +228,31 @@ class DashboardScreen(ctk.CTkFrame):
         self.tabview.add("Incoming Offers")
         self.tabview.add("Profile")
 
-        self.market_frame = ctk.CTkScrollableFrame(self.tabview.tab("Marketplace"))
-        self.market_frame.pack(fill="both", expand=True)
-
-        self.library_frame = ctk.CTkScrollableFrame(self.tabview.tab("My Library"))
-        self.library_frame.pack(fill="both", expand=True)
+        self.search_bar = ctk.CTkFrame(self.tabview.tab("Marketplace"), fg_color="transparent")
+        self.search_bar.pack(fill="x", padx=10, pady=(0, 5))
+        self.entry_search = ctk.CTkEntry(self.search_bar, placeholder_text="Search title, author or ISBN")
+        self.entry_search.pack(side="left", fill="x", expand=True)
+        self.entry_search.bind("<Return>", lambda e: self.search_event())
+        ctk.CTkButton(self.search_bar, text="Search", width=80, command=self.search_event).pack(side="left", padx=(5, 0))
+        ctk.CTkButton(self.search_bar, text="Clear", width=60, fg_color="transparent", border_width=1, command=self.clear_search_event).pack(side="left", padx=(5, 0))
+
+        self.market_list = VirtualList(
+            self.tabview.tab("Marketplace"),
+            lambda parent: BookCard(parent, self.open_swap_dialog, self.is_mine,
+                                    wishes=self.wishes, on_wish=self.handle_wish),
+            ROW_HEIGHT, load_more=self.load_more_market, empty_text="No books on the market yet.",
+        )
+        self.market_list.pack(fill="both", expand=True)
+        self.market_cursor = None
+
+        self.library_list = VirtualList(
+            self.tabview.tab("My Library"),
+            lambda parent: BookCard(parent, lambda x: None, self.is_mine,
+                                    lookups=self.failed_lookups, on_retry_lookup=self.handle_retry_lookup),
+            ROW_HEIGHT, load_more=self.load_more_library, empty_text="You haven't listed any books yet.",
+        )
+        self.library_list.pack(fill="both", expand=True)
+        self.library_cursor = None
 
         self.offers_frame = ctk.CTkScrollableFrame(self.tabview.tab("Incoming Offers"))
         self.offers_frame.pack(fill="both", expand=True)
@@ -215,6 +288,26 @@ class DashboardScreen(ctk.CTkFrame):
 
         ctk.CTkButton(self.edit_frame, text="Update Profile", command=self.update_profile_event, fg_color="#2CC985", hover_color="#229C68").pack(pady=10)
 
+        self.watch_frame = ctk.CTkFrame(self.profile_frame)
+        self.watch_frame.pack(fill="x", pady=10)
+        ctk.CTkLabel(self.watch_frame, text="Watches", font=("Roboto", 18, "bold")).pack(pady=10)
+        ctk.CTkLabel(self.watch_frame, text="Get an alert when a matching book is listed.", text_color="gray70").pack()
+
+        watch_bar = ctk.CTkFrame(self.watch_frame, fg_color="transparent")
+        watch_bar.pack(pady=5)
+        self.watch_kind = ctk.CTkOptionMenu(watch_bar, values=["TITLE", "AUTHOR", "ISBN"], width=100)
+        self.watch_kind.pack(side="left")
+        self.entry_watch = ctk.CTkEntry(watch_bar, placeholder_text="Words or ISBN", width=220)
+        self.entry_watch.pack(side="left", padx=5)
+        self.entry_watch.bind("<Return>", lambda e: self.add_watch_event())
+        ctk.CTkButton(watch_bar, text="Watch", width=70, command=self.add_watch_event).pack(side="left")
+
+        self.watch_list = ctk.CTkFrame(self.watch_frame, fg_color="transparent")
+        self.watch_list.pack(fill="x", padx=10, pady=(0, 10))
+
+        # Swap cards are patched from the event stream; see on_event
+        self.winfo_toplevel().events.listen(self, self.on_event)
+
         self.load_data()
 
     # Navigation Helpers
@@ -223,38 +316,147 @@ class DashboardScreen(ctk.CTkFrame):
     def show_offers(self): self.tabview.set("Incoming Offers")
     def show_profile(self): self.tabview.set("Profile")
 
+    def fetch(self, channel, fn, *args, on_done=None, **kwargs):
+        """
+        Runs an API call in the background, showing the loading indicator until
+        it answers. A newer fetch on the same channel supersedes an older one.
+        """
+        self.loading.add(channel)
+        self.loading_label.configure(text="Loading...")
+
+        def finish():
+            self.loading.discard(channel)
+            if not self.loading:
+                self.loading_label.configure(text="")
+
+        def done(result):
+            finish()
+            if result == 401 or (isinstance(result, tuple) and result and result[0] == 401):
+                self.winfo_toplevel().logout()
+                return
+            if on_done: on_done(result)
+
+        def failed(error):
+            finish()
+            print(f"Error: {error}")
+
+        background.submit(self, fn, *args, on_done=done, on_error=failed, channel=channel, **kwargs)
+
     def load_data(self):
         if not self.api: return
-        user = self.api.get_me()
-        if user and user != 401:
-            self.user_id = int(user['id'])
-            self.label_listed.configure(text=f"Books Listed: {user.get('books_listed', 0)}")
-            self.label_swapped.configure(text=f"Books Received: {user.get('books_swapped', 0)}")
-            self.label_current_email.configure(text=f"Current Email: {user.get('email', '-')}")
-
-        all_books = self.api.get_market_books()
-        if all_books == 401:
-            self.winfo_toplevel().logout()
+        # A refresh makes any half-loaded next page stale
+        for channel in ("market-more", "library-more"):
+            background.cancel(channel)
+            self.loading.discard(channel)
+        self.fetch("me", self.api.get_me, on_done=self.show_me)
+        if self.user_id is not None:
+            self.fetch("market", self.api.get_market_books_page, self.user_id, limit=PAGE_SIZE, on_done=self.show_market_page)
+        self.fetch("library", self.api.get_my_books_page, limit=PAGE_SIZE, on_done=self.show_library_page)
+        self.fetch("swaps", self.api.get_my_swaps, on_done=self.show_swaps)
+        self.fetch("wishes", self.api.get_wishes, on_done=self.show_wishes)
+        self.fetch("watches", self.api.get_watches, on_done=self.show_watches)
+
+    def show_me(self, user):
+        if not user: return
+        user_id = int(user['id'])
+        if user_id != self.user_id:
+            # The marketplace excludes our own books, so it needs the id first
+            self.user_id = user_id
+            self.fetch("market", self.api.get_market_books_page, self.user_id, limit=PAGE_SIZE, on_done=self.show_market_page)
+        self.label_listed.configure(text=f"Books Listed: {user.get('books_listed', 0)}")
+        self.label_swapped.configure(text=f"Books Received: {user.get('books_swapped', 0)}")
+        self.label_current_email.configure(text=f"Current Email: {user.get('email', '-')}")
+
+    def show_market_page(self, page):
+        market_books, self.market_cursor = page
+        if not isinstance(market_books, list): market_books = []
+        self.market_list.set_items(market_books, has_more=bool(self.market_cursor))
+
+    def show_library_page(self, page):
+        my_books, self.library_cursor = page
+        if not isinstance(my_books, list): my_books = []
+        self.library_list.set_items(my_books, has_more=bool(self.library_cursor))
+        self.schedule_lookup_poll()
+
+    def show_swaps(self, swaps):
+        if isinstance(swaps, list):
+             self.render_offers(swaps)
+
+    def show_wishes(self, wishes):
+        if not isinstance(wishes, list): return
+        self.wishes.clear()
+        self.wishes.update(w['isbn'] for w in wishes)
+        self.market_list.redraw()
+
+    def handle_wish(self, book):
+        isbn = book['isbn']
+        if isbn in self.wishes:
+            self.wishes.discard(isbn)
+            fn = self.api.remove_wish
+        else:
+            self.wishes.add(isbn)
+            fn = self.api.add_wish
+        self.market_list.redraw()
+        def done(result):
+            success, msg = result
+            if not success:
+                print(f"Error: {msg}")
+            # Re-read the list either way; a match also removes the wish
+            self.fetch("wishes", self.api.get_wishes, on_done=self.show_wishes)
+        self.fetch(f"wish-{isbn}", fn, isbn, on_done=done)
+
+    def show_watches(self, watches):
+        if not isinstance(watches, list): return
+        for w in self.watch_list.winfo_children(): w.destroy()
+        if not watches:
+            ctk.CTkLabel(self.watch_list, text="No watches yet.", text_color="gray70").pack()
             return
-        if not isinstance(all_books, list): all_books = []
-
-        market_books = []
-        my_books = []
-        for b in all_books:
-            owner = int(b.get('owner_id', -1))
-            if owner != self.user_id:
-                if b.get('status') == 'AVAILABLE': market_books.append(b)
+        for watch in watches:
+            row = ctk.CTkFrame(self.watch_list, fg_color="transparent")
+            row.pack(fill="x", pady=2)
+            text = f"{watch['kind'].title()}: {watch['value']}"
+            if watch.get('last_matched_at'):
+                text += f"  (last match {watch['last_matched_at'][:10]})"
+            ctk.CTkLabel(row, text=text, anchor="w").pack(side="left", fill="x", expand=True)
+            ctk.CTkButton(row, text="Remove", width=70, fg_color="transparent", border_width=1,
+                          command=lambda watch_id=watch['id']: self.remove_watch_event(watch_id)).pack(side="right")
+
+    def add_watch_event(self):
+        value = self.entry_watch.get().strip()
+        if not value: return
+        def added(result):
+            success, msg = result
+            if success:
+                self.entry_watch.delete(0, 'end')
+                self.fetch("watches", self.api.get_watches, on_done=self.show_watches)
             else:
-                 my_books.append(b)
+                from tkinter import messagebox
+                messagebox.showerror("Error", msg)
+        self.fetch("watch-add", self.api.add_watch, self.watch_kind.get(), value, on_done=added)
+
+    def remove_watch_event(self, watch_id):
+        def removed(result):
+            success, msg = result
+            if not success: print(f"Error: {msg}")
+            self.fetch("watches", self.api.get_watches, on_done=self.show_watches)
+        self.fetch(f"watch-{watch_id}", self.api.remove_watch, watch_id, on_done=removed)
+
+    def search_event(self):
+        query = self.entry_search.get().strip()
+        if not query:
+            self.clear_search_event()
+            return
+        background.cancel("market-more")
+        self.fetch("market", self.api.search_books, query, on_done=self.show_search_results)
 
-        self.my_books = my_books
-        self.render_market(market_books)
-        self.render_library(self.my_books)
+    def show_search_results(self, results):
+        if not isinstance(results, list): results = []
+        self.market_cursor = None
+        self.market_list.set_items([b for b in results if b.get('owner_id') != self.user_id])
 
-        # Load Swaps
-        swaps = self.api.get_my_swaps()
-        if isinstance(swaps, list):
-             self.render_offers(swaps)
+    def clear_search_event(self):
+        self.entry_search.delete(0, 'end')
+        self.load_data()
 
     def update_profile_event(self):
         email = self.entry_email.get()
@@ -269,12 +471,17 @@ class DashboardScreen(ctk.CTkFrame):
              messagebox.showerror("Error", "Old Password is required to set a New Password.")
              return
 
-        success, msg = self.api.update_profile(
+        self.fetch(
+            "profile",
+            self.api.update_profile,
             email=email if email else None,
             password=password if password else None,
-            old_password=old_password if old_password else None
+            old_password=old_password if old_password else None,
+            on_done=self.profile_updated,
         )
 
+    def profile_updated(self, result):
+        success, msg = result
         from tkinter import messagebox
         if success:
             messagebox.showinfo("Success", "Profile updated!")
@@ -285,20 +492,79 @@ class DashboardScreen(ctk.CTkFrame):
         else:
             messagebox.showerror("Error", msg)
 
-    def render_market(self, books):
-        for w in self.market_frame.winfo_children(): w.destroy()
-        for book in books:
-            card = BookCard(self.market_frame, book, self.user_id, self.open_swap_dialog)
-            card.pack(fill="x", padx=10, pady=10)
-
-    def render_library(self, books):
-        for w in self.library_frame.winfo_children(): w.destroy()
-        for book in books:
-            card = BookCard(self.library_frame, book, self.user_id, lambda x: None)
-            card.pack(fill="x", padx=10, pady=10)
+    def is_mine(self, book):
+        return book['owner_id'] == self.user_id
+
+    def load_more_market(self):
+        def append(page):
+            books, cursor = page
+            if not isinstance(books, list):
+                self.market_list.finish_loading()
+                return
+            self.market_cursor = cursor
+            self.market_list.append(books, has_more=bool(cursor))
+        self.fetch("market-more", self.api.get_market_books_page, self.user_id,
+                   cursor=self.market_cursor, limit=PAGE_SIZE, on_done=append)
+
+    def load_more_library(self):
+        def append(page):
+            books, cursor = page
+            if not isinstance(books, list):
+                self.library_list.finish_loading()
+                return
+            self.library_cursor = cursor
+            self.library_list.append(books, has_more=bool(cursor))
+            self.schedule_lookup_poll()
+        self.fetch("library-more", self.api.get_my_books_page,
+                   cursor=self.library_cursor, limit=PAGE_SIZE, on_done=append)
+
+    def pending_lookups(self):
+        return [b['id'] for b in self.library_list.items
+                if b.get('status') == 'PENDING_METADATA' and b['id'] not in self.failed_lookups]
+
+    def schedule_lookup_poll(self):
+        if self.lookup_poll is None and self.pending_lookups():
+            self.lookup_poll = self.after(LOOKUP_POLL_MS, self.poll_lookups)
+
+    def poll_lookups(self):
+        """Checks books still waiting on metadata and refreshes once any lookup finishes."""
+        self.lookup_poll = None
+        if not self.winfo_exists(): return
+        book_ids = tuple(self.pending_lookups())
+        if book_ids:
+            background.submit(self, self.get_metadata_jobs, book_ids, on_done=self.lookups_polled, channel="lookups")
+
+    def get_metadata_jobs(self, book_ids):
+        # Runs on a background worker: no Tk calls
+        return {book_id: self.api.get_metadata_job(book_id) for book_id in book_ids}
+
+    def lookups_polled(self, jobs):
+        changed = False
+        for book_id, job in jobs.items():
+            # No job any more means the lookup found nothing and took the book with it
+            if not job or job['state'] in ('DONE', 'NOT_FOUND'):
+                changed = True
+            elif job['state'] == 'DEAD':
+                self.failed_lookups[book_id] = job
+                changed = True
+        if changed:
+            self.load_data()
+        else:
+            self.schedule_lookup_poll()
+
+    def handle_retry_lookup(self, book_id):
+        def retried(result):
+            success, msg = result
+            if success:
+                self.failed_lookups.pop(book_id, None)
+                self.load_data()
+            else:
+                print(f"Error: {msg}")
+        self.fetch(f"retry-{book_id}", self.api.retry_metadata_job, book_id, on_done=retried)
 
     def render_offers(self, swaps):
         for w in self.offers_frame.winfo_children(): w.destroy()
+        self.offer_cards = {}
         if not swaps:
              ctk.CTkLabel(self.offers_frame, text="No active transactions.").pack(pady=20)
              return
@@ -313,26 +579,55 @@ class DashboardScreen(ctk.CTkFrame):
                 self.handle_confirm
             )
             card.pack(fill="x", padx=10, pady=10)
+            self.offer_cards[tx['id']] = card
+
+    def on_event(self, event_type, data):
+        if event_type == "resync":
+            self.load_data()
+        elif event_type == "transaction":
+            card = self.offer_cards.get(data['id'])
+            if card is None or not card.winfo_exists():
+                # A new request: only the list endpoint has its titles and usernames
+                self.fetch("swaps", self.api.get_my_swaps, on_done=self.show_swaps)
+            else:
+                card.show({**card.tx, **data})
+            if data['status'] in ('REQUESTED', 'COMPLETED'):
+                # Points and swap counts moved
+                self.fetch("me", self.api.get_me, on_done=self.show_me)
+        elif event_type == "book_removed":
+            self.library_list.items = [b for b in self.library_list.items if b['id'] != data['id']]
+            self.library_list.redraw()
+            self.alert_label.configure(text=f"ISBN {data['isbn']} wasn't listed: {data.get('reason') or 'lookup failed'}")
+            self.fetch("me", self.api.get_me, on_done=self.show_me)
+        elif event_type == "watch":
+            book = data['book']
+            self.alert_label.configure(text=f"Just listed: {book['title']}" + (f" by {book['author']}" if book.get('author') else ""))
+            if self.user_id is not None and not self.entry_search.get().strip():
+                self.fetch("market", self.api.get_market_books_page, self.user_id, limit=PAGE_SIZE, on_done=self.show_market_page)
+            self.fetch("watches", self.api.get_watches, on_done=self.show_watches)
+
+    def after_action(self, result):
+         success, msg = result
+         # While the event stream is up it delivers the change
+         if success and not self.winfo_toplevel().events.connected: self.load_data()
+         elif not success: print(f"Error: {msg}")
 
     def handle_accept(self, tx_id):
-         success, msg = self.api.accept_request(tx_id)
-         if success: self.load_data()
-         else: print(f"Error: {msg}")
+         self.fetch(f"tx-{tx_id}", self.api.accept_request, tx_id, on_done=self.after_action)
 
     def handle_ship(self, tx_id):
          # Prompt tracking?
-         success, msg = self.api.ship_book(tx_id, "TRACK123") # Mock tracking for now
-         if success: self.load_data()
-         else: print(f"Error: {msg}")
+         self.fetch(f"tx-{tx_id}", self.api.ship_book, tx_id, "TRACK123", on_done=self.after_action) # Mock tracking for now
 
     def handle_confirm(self, tx_id):
-         success, msg = self.api.confirm_receipt(tx_id)
-         if success: self.load_data()
-         else: print(f"Error: {msg}")
+         self.fetch(f"tx-{tx_id}", self.api.confirm_receipt, tx_id, on_done=self.after_action)
 
     def open_swap_dialog(self, target_book_id):
-        # Filter my books to only show AVAILABLE ones for offering
-        available_books = [b for b in self.my_books if b.get('status') == 'AVAILABLE']
+        self.fetch("swap-dialog", self.api.get_my_available_books,
+                   on_done=lambda books: self.show_swap_dialog(books, target_book_id))
+
+    def show_swap_dialog(self, available_books, target_book_id):
+        if not isinstance(available_books, list): available_books = []
         if not available_books:
             from tkinter import messagebox
             messagebox.showinfo("No Books", "You don't have any 'AVAILABLE' books to swap! List one first.")
@@ -343,13 +638,15 @@ class DashboardScreen(ctk.CTkFrame):
 
     def handle_trade_confirm(self, my_id, target_id):
         print(f"Swap Requested: Offering {my_id} for {target_id}")
-        success, msg = self.api.request_book(book_id=target_id, offered_book_id=my_id)
-        if success:
-             print("Request sent.")
-             self.tabview.set("Incoming Offers") # Switch to offers tab
-             self.load_data()
-        else:
-             print(f"Server error: {msg}")
+        def sent(result):
+            success, msg = result
+            if success:
+                 print("Request sent.")
+                 self.tabview.set("Incoming Offers") # Switch to offers tab
+                 self.load_data()
+            else:
+                 print(f"Server error: {msg}")
+        self.fetch("swap-request", self.api.request_book, book_id=target_id, offered_book_id=my_id, on_done=sent)
 
     def open_upload_dialog_ui(self):
          try:
@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from background import background
 
 class LoginScreen(ctk.CTkFrame):
     def __init__(self, master, on_login_success, on_go_to_register):
@@ -70,8 +71,13 @@ class LoginScreen(ctk.CTkFrame):
 
         self.error_label.configure(text="Logging in...", text_color="white")
 
-        # Call the API via the master app controller
-        success, message = self.winfo_toplevel().api.login(email, password)
+        # Call the API via the master app controller, off the UI thread
+        self.login_button.configure(state="disabled")
+        background.submit(self, self.winfo_toplevel().api.login, email, password, on_done=self.login_done)
+
+    def login_done(self, result):
+        success, message = result
+        self.login_button.configure(state="normal")
         if success:
              self.error_label.configure(text="")
              # Save session
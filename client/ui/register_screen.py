@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from background import background
 
 class RegisterScreen(ctk.CTkFrame):
     def __init__(self, master, on_register_success, on_back_to_login):
@@ -72,9 +73,13 @@ class RegisterScreen(ctk.CTkFrame):
 
         self.error_label.configure(text="Registering...", text_color="white")
 
-        # Call API
-        success, message = self.winfo_toplevel().api.register(email, username, password)
+        # Call API, off the UI thread
+        self.register_button.configure(state="disabled")
+        background.submit(self, self.winfo_toplevel().api.register, email, username, password, on_done=self.register_done)
 
+    def register_done(self, result):
+        success, message = result
+        self.register_button.configure(state="normal")
         if success:
             self.error_label.configure(text="")
             # Optionally clear fields
@@ -1,5 +1,7 @@
 import customtkinter as ctk
 from tkinter import messagebox
+from background import background
+from ui.dashboard_screen import book_label
 
 class SwapsScreen(ctk.CTkFrame):
     def __init__(self, master):
@@ -26,6 +28,9 @@ class SwapsScreen(ctk.CTkFrame):
         self.sidebar_button_3 = ctk.CTkButton(self.sidebar_frame, text="Profile", height=40, width=160, font=("Roboto", 14), corner_radius=8, fg_color="transparent", border_width=1, text_color=("gray10", "gray90"))
         self.sidebar_button_3.grid(row=3, column=0, padx=20, pady=10)
 
+        self.status_label = ctk.CTkLabel(self.sidebar_frame, text="", text_color="gray70")
+        self.status_label.grid(row=5, column=0, padx=20, pady=(0, 10), sticky="s")
+
         # Main Content Area - Tabs
         self.tabview = ctk.CTkTabview(self, width=800, height=500, corner_radius=10)
         self.tabview.grid(row=0, column=1, padx=(20, 20), pady=(20, 20), sticky="nsew")
@@ -46,6 +51,13 @@ class SwapsScreen(ctk.CTkFrame):
         self.outgoing_frame = ctk.CTkScrollableFrame(self.tabview.tab("Outgoing Books"), label_text="Requests for My Books")
         self.outgoing_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
 
+        self.my_id = None
+        self.swaps = {} # tx id -> tx dict as last rendered
+        self.cards = {} # tx id -> card frame
+
+        # Cards are patched from the event stream; see on_event
+        self.winfo_toplevel().events.listen(self, self.on_event)
+
         # Start loading data
         self.load_data()
 
@@ -56,41 +68,74 @@ class SwapsScreen(ctk.CTkFrame):
         self.winfo_toplevel().show_swaps()
 
     def load_data(self):
-        # Clear existing
-        for widget in self.incoming_frame.winfo_children(): widget.destroy()
-        for widget in self.outgoing_frame.winfo_children(): widget.destroy()
-
-        # Fetch swaps & user info
-        swaps = self.winfo_toplevel().api.get_my_swaps()
-        if swaps == 401:
+        self.status_label.configure(text="Loading...")
+        background.submit(self, self.fetch_swaps, self.winfo_toplevel().api,
+                          on_done=self.show_swaps, channel="swaps-screen")
+
+    @staticmethod
+    def fetch_swaps(api):
+        # Runs on a background worker: no Tk calls
+        return api.get_my_swaps(), api.get_me()
+
+    def show_swaps(self, result):
+        swaps, user_info = result
+        self.status_label.configure(text="")
+        if swaps == 401 or user_info == 401:
             self.winfo_toplevel().logout()
             return
 
-        user_info = self.winfo_toplevel().api.get_me()
-        if user_info == 401:
-             self.winfo_toplevel().logout()
-             return
-
         if not user_info:
             return
 
-        my_id = user_info['id']
-        self.render_swaps(swaps, my_id)
+        # Clear existing
+        for widget in self.incoming_frame.winfo_children(): widget.destroy()
+        for widget in self.outgoing_frame.winfo_children(): widget.destroy()
+        self.swaps = {}
+        self.cards = {}
+
+        self.my_id = user_info['id']
+        self.render_swaps(swaps, self.my_id)
 
     def render_swaps(self, swaps, my_id):
         for tx in swaps:
             if tx['receiver_id'] == my_id:
-                self.render_incoming_card(tx)
+                frame = self.incoming_frame
             elif tx['giver_id'] == my_id:
-                self.render_outgoing_card(tx)
-
-    def render_incoming_card(self, tx):
-        card = ctk.CTkFrame(self.incoming_frame, corner_radius=10, border_width=1, border_color="gray30", bg_color="transparent")
-        card.pack(fill="x", padx=10, pady=5)
-
-        info = f"Book ID: {tx['book_id']} | Status: {tx['status']}"
+                frame = self.outgoing_frame
+            else:
+                continue
+            card = ctk.CTkFrame(frame, corner_radius=10, border_width=1, border_color="gray30", bg_color="transparent")
+            card.pack(fill="x", padx=10, pady=5)
+            self.swaps[tx['id']] = tx
+            self.cards[tx['id']] = card
+            self.fill_card(card, tx)
+
+    def fill_card(self, card, tx):
+        if tx['receiver_id'] == self.my_id:
+            self.render_incoming_card(card, tx)
+        else:
+            self.render_outgoing_card(card, tx)
+
+    def on_event(self, event_type, data):
+        if event_type == "resync":
+            self.load_data()
+        elif event_type == "transaction":
+            tx = self.swaps.get(data['id'])
+            card = self.cards.get(data['id'])
+            if tx is None or card is None or not card.winfo_exists():
+                # A new request: only the list endpoint has its titles and usernames
+                self.load_data()
+                return
+            tx.update(data)
+            for widget in card.winfo_children(): widget.destroy()
+            self.fill_card(card, tx)
+
+    def render_incoming_card(self, card, tx):
+        info = f"{book_label(tx.get('book'), tx['book_id'])} from {tx.get('giver_username', '-')} | Status: {tx['status']}"
         if tx['tracking_number']:
             info += f" | Tracking: {tx['tracking_number']}"
+        if tx.get('cycle_id'):
+            info += f" | Trade cycle #{tx['cycle_id']}"
 
         label = ctk.CTkLabel(card, text=info, font=("Roboto", 14))
         label.pack(side="left", padx=10, pady=10)
@@ -100,11 +145,10 @@ class SwapsScreen(ctk.CTkFrame):
                                 font=("Roboto", 12), height=30, bg_color="transparent")
             btn.pack(side="right", padx=10, pady=10)
 
-    def render_outgoing_card(self, tx):
-        card = ctk.CTkFrame(self.outgoing_frame, corner_radius=10, border_width=1, border_color="gray30", bg_color="transparent")
-        card.pack(fill="x", padx=10, pady=5)
-
-        info = f"Book ID: {tx['book_id']} | Status: {tx['status']}"
+    def render_outgoing_card(self, card, tx):
+        info = f"{book_label(tx.get('book'), tx['book_id'])} for {tx.get('receiver_username', '-')} | Status: {tx['status']}"
+        if tx.get('cycle_id'):
+            info += f" | Trade cycle #{tx['cycle_id']}"
         label = ctk.CTkLabel(card, text=info, font=("Roboto", 14))
         label.pack(side="left", padx=10, pady=10)
 
@@ -117,26 +161,27 @@ class SwapsScreen(ctk.CTkFrame):
                                 font=("Roboto", 12), height=30, bg_color="transparent")
             btn.pack(side="right", padx=10, pady=10)
 
+    def run_action(self, fn, tx_id, *args, success_text):
+        def done(result):
+            success, msg = result
+            if success: self.show_success(success_text)
+            else: self.show_error(msg)
+            # While the event stream is up it delivers the change (to both parties)
+            if not success or not self.winfo_toplevel().events.connected:
+                self.load_data()
+        background.submit(self, fn, tx_id, *args, on_done=done, channel=f"tx-{tx_id}")
+
     def accept_action(self, tx_id):
-        success, msg = self.winfo_toplevel().api.accept_request(tx_id)
-        if success: self.show_success("Accepted!")
-        else: self.show_error(msg)
-        self.load_data()
+        self.run_action(self.winfo_toplevel().api.accept_request, tx_id, success_text="Accepted!")
 
     def ship_action(self, tx_id):
         dialog = ctk.CTkInputDialog(text="Enter Tracking Number:", title="Ship Book")
         tracking = dialog.get_input()
         if tracking:
-            success, msg = self.winfo_toplevel().api.ship_book(tx_id, tracking)
-            if success: self.show_success("Shipped!")
-            else: self.show_error(msg)
-            self.load_data()
+            self.run_action(self.winfo_toplevel().api.ship_book, tx_id, tracking, success_text="Shipped!")
 
     def confirm_action(self, tx_id):
-        success, msg = self.winfo_toplevel().api.confirm_receipt(tx_id)
-        if success: self.show_success("Confirmed! Points released.")
-        else: self.show_error(msg)
-        self.load_data()
+        self.run_action(self.winfo_toplevel().api.confirm_receipt, tx_id, success_text="Confirmed! Points released.")
 
     def show_error(self, msg):
         messagebox.showerror("Error", msg)
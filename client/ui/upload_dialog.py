@@ -1,5 +1,25 @@
+import csv
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
+from background import background
+
+CONDITIONS = ["New", "Like New", "Good", "Fair"]
+
+def parse_batch_lines(text, default_condition):
+    """
+    Parses pasted or CSV text into [{"isbn", "condition"}]. Each line is either
+    a bare ISBN or "isbn,condition"; a header row and blank lines are skipped.
+    """
+    items = []
+    for row in csv.reader(text.splitlines()):
+        if not row or not row[0].strip():
+            continue
+        isbn = row[0].strip()
+        if isbn.lower() == "isbn":
+            continue
+        condition = row[1].strip() if len(row) > 1 and row[1].strip() else default_condition
+        items.append({"isbn": isbn, "condition": condition})
+    return items
 
 class UploadDialog(ctk.CTkToplevel):
     def __init__(self, master, api_client, on_success):
@@ -9,7 +29,7 @@ class UploadDialog(ctk.CTkToplevel):
         self.on_success = on_success
 
         self.title("Smart List Book")
-        self.geometry("400x300")
+        self.geometry("420x520")
 
         self.grid_columnconfigure(0, weight=1)
 
@@ -18,14 +38,26 @@ class UploadDialog(ctk.CTkToplevel):
         self.isbn_entry = ctk.CTkEntry(self, placeholder_text="ISBN (e.g., 978014...)", width=250)
         self.isbn_entry.grid(row=1, column=0, pady=10)
 
-        self.condition_opt = ctk.CTkOptionMenu(self, values=["New", "Like New", "Good", "Fair"])
+        self.condition_opt = ctk.CTkOptionMenu(self, values=CONDITIONS)
         self.condition_opt.grid(row=2, column=0, pady=10)
 
         self.submit_btn = ctk.CTkButton(self, text="Auto-Fetch & List", command=self.submit, fg_color="#2CC985", hover_color="#229C68")
         self.submit_btn.grid(row=3, column=0, pady=20)
 
-        self.status_label = ctk.CTkLabel(self, text="", text_color="gray")
-        self.status_label.grid(row=4, column=0)
+        # Bulk import: one ISBN per line, optionally "isbn,condition"
+        ctk.CTkLabel(self, text="...or import a whole shelf (one ISBN per line, or isbn,condition)", text_color="gray70").grid(row=4, column=0, padx=20)
+
+        self.batch_box = ctk.CTkTextbox(self, width=340, height=140)
+        self.batch_box.grid(row=5, column=0, pady=5)
+
+        batch_buttons = ctk.CTkFrame(self, fg_color="transparent")
+        batch_buttons.grid(row=6, column=0, pady=10)
+        ctk.CTkButton(batch_buttons, text="Load CSV...", width=110, fg_color="transparent", border_width=1, command=self.load_csv).pack(side="left", padx=5)
+        self.batch_btn = ctk.CTkButton(batch_buttons, text="Import All", width=110, command=self.submit_batch, fg_color="#2CC985", hover_color="#229C68")
+        self.batch_btn.pack(side="left", padx=5)
+
+        self.status_label = ctk.CTkLabel(self, text="", text_color="gray", wraplength=360)
+        self.status_label.grid(row=7, column=0)
 
     def submit(self):
         isbn = self.isbn_entry.get()
@@ -38,9 +70,10 @@ class UploadDialog(ctk.CTkToplevel):
         self.status_label.configure(text="Fetching data...", text_color="yellow")
         self.submit_btn.configure(state="disabled")
 
-        # Run in main thread for now, ui might freeze slightly but ok for simple client
-        success, msg = self.api_client.upload_book(isbn, condition)
+        background.submit(self, self.api_client.upload_book, isbn, condition, on_done=self.uploaded)
 
+    def uploaded(self, result):
+        success, msg = result
         if success:
              messagebox.showinfo("Success", msg)
              self.on_success()
@@ -48,3 +81,51 @@ class UploadDialog(ctk.CTkToplevel):
         else:
             self.status_label.configure(text=msg, text_color="red")
             self.submit_btn.configure(state="normal")
+
+    def load_csv(self):
+        path = filedialog.askopenfilename(parent=self, filetypes=[("CSV / text", "*.csv *.txt"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                text = f.read()
+        except OSError as e:
+            self.status_label.configure(text=f"Could not read file: {e}", text_color="red")
+            return
+        self.batch_box.delete("1.0", "end")
+        self.batch_box.insert("1.0", text)
+
+    def submit_batch(self):
+        items = parse_batch_lines(self.batch_box.get("1.0", "end"), self.condition_opt.get())
+        if not items:
+            self.status_label.configure(text="Paste or load at least one ISBN", text_color="red")
+            return
+
+        self.status_label.configure(text=f"Importing {len(items)} books...", text_color="yellow")
+        self.batch_btn.configure(state="disabled")
+
+        background.submit(self, self.api_client.upload_books_batch, items,
+                          on_done=lambda response: self.batch_uploaded(items, response))
+
+    def batch_uploaded(self, items, response):
+        success, result = response
+        self.batch_btn.configure(state="normal")
+        if not success:
+            self.status_label.configure(text=result, text_color="red")
+            return
+
+        failed = [r for r in result["results"] if r.get("error")]
+        if result["created"]:
+            self.on_success()
+        if not failed:
+            messagebox.showinfo("Success", f"Listed {result['created']} books!")
+            self.destroy()
+            return
+
+        # Keep only the entries that failed so they can be corrected and retried
+        self.batch_box.delete("1.0", "end")
+        self.batch_box.insert("1.0", "\n".join(f"{items[r['index']]['isbn']},{items[r['index']]['condition']}" for r in failed))
+        self.status_label.configure(
+            text=f"Listed {result['created']}, {len(failed)} not found (left in the box above)",
+            text_color="orange",
+        )
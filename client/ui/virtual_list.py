@@ -0,0 +1,141 @@
+import sys
+import customtkinter as ctk
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list of fixed-height rows that only builds enough row widgets
+    to fill the viewport. Rows are recycled as the user scrolls: item i is
+    always shown by pooled row i % pool size, which gets row.show(item)
+    whenever it is moved onto a different item.
+
+    When the viewport comes within `prefetch_rows` of the end and the last
+    set_items/append call said there is more, load_more() is called; it should
+    end with append() (or finish_loading() on failure).
+    """
+
+    def __init__(self, master, make_row, row_height, load_more=None, empty_text="", overscan=2, prefetch_rows=10, gap=10):
+        super().__init__(master, fg_color="transparent")
+        self.make_row = make_row
+        self.row_height = row_height
+        self.load_more = load_more
+        self.overscan = overscan
+        self.prefetch_rows = prefetch_rows
+        self.gap = gap
+
+        self.items = []
+        self.has_more = False
+        self.loading = False
+        self._rows = [] # [(row widget, canvas window id, bound item index)]
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.canvas = ctk.CTkCanvas(self, highlightthickness=0, bd=0, bg=self._apply_appearance_mode(self._bg_color),
+                                    yscrollincrement=row_height // 4)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self.empty_label = ctk.CTkLabel(self, text=empty_text)
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        # bind_all so the wheel works over the rows too; _on_wheel ignores events outside this list.
+        # The bindings outlive the list unless destroy() takes them out again
+        sequences = ("<Button-4>", "<Button-5>") if sys.platform.startswith("linux") else ("<MouseWheel>",)
+        self._wheel_bindings = [(sequence, self.bind_all(sequence, self._on_wheel, add="+")) for sequence in sequences]
+
+    def destroy(self):
+        for sequence, funcid in self._wheel_bindings:
+            # unbind_all would drop every other list's handler too, so only this one's line is removed
+            script = self.tk.call("bind", "all", sequence)
+            keep = [line for line in script.split("\n") if not line.startswith(f'if {{"[{funcid} ')]
+            self.tk.call("bind", "all", sequence, "\n".join(keep))
+            self.deletecommand(funcid)
+        self._wheel_bindings = []
+        super().destroy()
+
+    def set_items(self, items, has_more=False):
+        self.items = list(items)
+        self.has_more = has_more
+        self.loading = False
+        self._rows = [(row, window, None) for row, window, _ in self._rows]
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def append(self, items, has_more=False):
+        self.items.extend(items)
+        self.has_more = has_more
+        self.loading = False
+        self.refresh()
+
+    def redraw(self):
+        """Re-shows the visible rows, for when something their cards read has changed."""
+        self._rows = [(row, window, None) for row, window, _ in self._rows]
+        self.refresh()
+
+    def finish_loading(self):
+        self.loading = False
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def _on_wheel(self, event):
+        if not self.winfo_exists():
+            return
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not self.winfo_ismapped():
+            return
+        if str(widget) != str(self) and not str(widget).startswith(str(self) + "."):
+            return
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.canvas.yview_scroll(-3, "units")
+        else:
+            self.canvas.yview_scroll(3, "units")
+        self.refresh()
+
+    def refresh(self):
+        if not self.winfo_exists(): return
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        total = len(self.items) * self.row_height
+        self.canvas.configure(scrollregion=(0, 0, width, max(total, height)))
+
+        if not self.items:
+            self.empty_label.place(relx=0.5, y=30, anchor="n")
+        else:
+            self.empty_label.place_forget()
+
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // self.row_height) - self.overscan)
+        last = min(len(self.items), int((top + height) // self.row_height) + 1 + self.overscan)
+
+        # Grow the pool to cover the viewport; never shrink it
+        needed = int(height // self.row_height) + 2 + 2 * self.overscan
+        if len(self._rows) < needed:
+            self._rows = [(row, window, None) for row, window, _ in self._rows]
+            while len(self._rows) < needed:
+                row = self.make_row(self.canvas)
+                window = self.canvas.create_window(0, 0, window=row, anchor="nw", state="hidden")
+                self._rows.append((row, window, None))
+
+        shown = set()
+        for index in range(first, last):
+            slot = index % len(self._rows)
+            row, window, bound = self._rows[slot]
+            if bound != index:
+                row.show(self.items[index])
+                self._rows[slot] = (row, window, index)
+            self.canvas.coords(window, self.gap, index * self.row_height + self.gap // 2)
+            self.canvas.itemconfigure(window, state="normal", width=max(1, width - 2 * self.gap),
+                                      height=self.row_height - self.gap)
+            shown.add(slot)
+        for slot, (row, window, _) in enumerate(self._rows):
+            if slot not in shown:
+                self.canvas.itemconfigure(window, state="hidden")
+
+        if (self.load_more and self.has_more and not self.loading
+                and last >= len(self.items) - self.prefetch_rows):
+            self.loading = True
+            self.after_idle(self.load_more)
@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+from app.core.database import engine
+from app import migrations
+
+async def main(args):
+    try:
+        if args.command == "upgrade":
+            version = await migrations.upgrade(engine, target=args.target or migrations.HEAD)
+            print(f"Database is at version {version}.")
+        elif args.command == "stamp":
+            await migrations.stamp(engine, target=args.target or migrations.HEAD)
+            print("Stamped.")
+        else:
+            async with engine.connect() as conn:
+                version = await conn.run_sync(migrations.current_version)
+            print(f"Current version: {version} (head: {migrations.HEAD})")
+            for migration in migrations.MIGRATIONS:
+                mark = "x" if migration.VERSION <= version else " "
+                print(f"  [{mark}] {migration.VERSION:04d} {migration.DESCRIPTION}")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="BookLoop schema migrations")
+    parser.add_argument("command", choices=["upgrade", "current", "stamp"], nargs="?", default="current")
+    parser.add_argument("target", type=int, nargs="?", help="Target version (defaults to head)")
+    asyncio.run(main(parser.parse_args()))
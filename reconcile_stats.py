@@ -0,0 +1,15 @@
+import asyncio
+import sys
+from app.core.database import AsyncSessionLocal
+from app.services.user_stats import reconcile_user_stats
+
+async def reconcile(dry_run: bool):
+    async with AsyncSessionLocal() as db:
+        drifted = await reconcile_user_stats(db, dry_run=dry_run)
+    for row in drifted:
+        print(f"user {row[0]}: listed {row[1]} -> {row[3]}, swapped {row[2]} -> {row[4]}")
+    verb = "would be corrected" if dry_run else "corrected"
+    print(f"{len(drifted)} user(s) {verb}.")
+
+if __name__ == "__main__":
+    asyncio.run(reconcile(dry_run="--check" in sys.argv))
@@ -1,14 +1,20 @@
 import asyncio
+from sqlalchemy import text
 from app.core.database import engine, Base
 from app.models import User, Book, Transaction
+from app import migrations
 
 async def reset():
     async with engine.begin() as conn:
         print("Dropping all tables...")
+        if conn.dialect.name == "sqlite":
+            await conn.execute(text("DROP TABLE IF EXISTS books_fts"))
         await conn.run_sync(Base.metadata.drop_all)
-        print("Creating all tables...")
-        await conn.run_sync(Base.metadata.create_all)
-        print("Database reset complete.")
+        await conn.run_sync(migrations.schema_version.drop, checkfirst=True)
+    print("Applying migrations...")
+    await migrations.upgrade(engine)
+    await engine.dispose()
+    print("Database reset complete.")
 
 if __name__ == "__main__":
     asyncio.run(reset())
@@ -0,0 +1,39 @@
+"""
+The tests run against a throwaway SQLite database. Settings are read when
+app.core.config is first imported, so the environment is set up here,
+before any test module imports the app.
+"""
+import asyncio
+import os
+import tempfile
+import pytest
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="book-loop-tests-"), "test.sqlite")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_path}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+@pytest.fixture
+def run():
+    """
+    run(test) awaits the coroutine function `test` on a freshly migrated
+    database, in an event loop of its own, and returns its result.
+    """
+    from app import migrations
+    from app.core.database import engine
+    from app.core.http import http_client
+
+    def runner(test):
+        async def main():
+            if os.path.exists(_db_path):
+                os.remove(_db_path)
+            await migrations.upgrade(engine, log=lambda message: None)
+            try:
+                return await test()
+            finally:
+                # Pooled connections and HTTP clients belong to this loop
+                await http_client.aclose()
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return runner
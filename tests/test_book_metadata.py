@@ -0,0 +1,102 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.main import app
+from app.services import book_metadata
+from app.services.book_metadata import MetadataUnavailable, get_book_metadata
+
+FOUND = {
+    "totalItems": 1,
+    "items": [{"volumeInfo": {
+        "title": "Dune",
+        "authors": ["Frank Herbert"],
+        "imageLinks": {"thumbnail": "http://covers.test/dune.jpg"},
+    }}],
+}
+
+# ISBN -> (status, content type, body) the stub answers with
+RESPONSES = {
+    "111": (200, "application/json", json.dumps(FOUND)),
+    "222": (200, "application/json", json.dumps({"totalItems": 0})),
+    "333": (503, "application/json", json.dumps({"error": "backend unavailable"})),
+    "444": (200, "text/html", "<html><body>Sign in to the Wi-Fi</body></html>"),
+    "555": (200, "application/json", "[]"),
+}
+
+class GoogleBooksStub(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        isbn = parse_qs(urlsplit(self.path).query)["q"][0].removeprefix("isbn:")
+        self.requests.append(isbn)
+        status, content_type, body = RESPONSES[isbn]
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def google_books(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GoogleBooksStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "GOOGLE_BOOKS_API_URL", f"http://127.0.0.1:{server.server_port}/books/v1/volumes")
+    monkeypatch.setattr(settings, "HTTP_CLIENT_RETRY_BACKOFF", 0)
+    GoogleBooksStub.requests = []
+    book_metadata.metadata_cache.clear()
+    yield GoogleBooksStub.requests
+    server.shutdown()
+    server.server_close()
+    book_metadata.metadata_cache.clear()
+
+def test_lookups_against_stub(run, google_books):
+    async def test():
+        async with AsyncSessionLocal() as db:
+            assert await get_book_metadata("111", db) == {
+                "title": "Dune", "author": "Frank Herbert", "image_url": "http://covers.test/dune.jpg",
+            }
+            assert await get_book_metadata("222", db) is None
+            assert await get_book_metadata("555", db) is None
+            for isbn in ("333", "444"):
+                with pytest.raises(MetadataUnavailable):
+                    await get_book_metadata(isbn, db, strict=True)
+
+            # Answers are remembered (not-found ones too); failures are asked again
+            book_metadata.metadata_cache.clear()
+            asked = len(google_books)
+            await get_book_metadata("111", db)
+            await get_book_metadata("222", db)
+            assert len(google_books) == asked
+            await get_book_metadata("444", db)
+            assert len(google_books) == asked + 1
+
+    run(test)
+
+def test_batch_upload_against_stub(run, google_books):
+    async def test():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.post("/auth/register", json={"email": "a@example.com", "username": "a", "password": "password1"})
+            token = (await client.post("/auth/login", data={"username": "a@example.com", "password": "password1"})).json()["access_token"]
+            response = await client.post(
+                "/books/batch",
+                json={"items": [{"isbn": isbn, "condition": "Good"} for isbn in ("111", "222", "333", "444")]},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["book"]["status"] == "AVAILABLE" and results[0]["book"]["title"] == "Dune"
+        assert results[1]["error"] == "Book not found on Google Books"
+        # Upstream errors and non-JSON answers are left to the enrichment workers
+        assert [r["book"]["status"] for r in results[2:]] == ["PENDING_METADATA", "PENDING_METADATA"]
+
+    run(test)
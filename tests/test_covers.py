@@ -0,0 +1,80 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.services.covers import COVER_SIZES, CoverCache, CoverUnavailable
+
+LIMIT = 64 * 1024
+CHUNK = 8192
+CHUNKS = 10_000 # what the endless stubs would send in total: 80 MB
+
+def _jpeg() -> bytes:
+    out = BytesIO()
+    Image.new("RGB", (300, 450), "navy").save(out, "JPEG")
+    return out.getvalue()
+
+class CoverStub(BaseHTTPRequestHandler):
+    sent = {} # path -> bytes written before the client hung up
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        if self.path == "/cover.jpg":
+            body = _jpeg()
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/declared-huge.jpg":
+            # Says how big it is up front; nothing past the headers should be read
+            self.send_header("Content-Length", str(CHUNKS * CHUNK))
+        self.end_headers()
+        # No length (or a huge one): keeps sending until the client goes away
+        self.sent[self.path] = 0
+        try:
+            for _ in range(CHUNKS):
+                self.wfile.write(b"\0" * CHUNK)
+                self.sent[self.path] += CHUNK
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def cover_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CoverStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "COVER_MAX_SOURCE_BYTES", LIMIT)
+    CoverStub.sent = {}
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+def test_cover_is_rendered_in_every_size(run, cover_server, tmp_path):
+    cache = CoverCache(str(tmp_path), 1024 * 1024)
+
+    async def test():
+        for size, dimensions in COVER_SIZES.items():
+            digest, path = await cache.get(f"{cover_server}/cover.jpg", size)
+            assert Image.open(path).size == dimensions
+
+    run(test)
+    assert cache.stats["upstream_fetches"] == 1
+
+@pytest.mark.parametrize("path", ["/endless.jpg", "/declared-huge.jpg"])
+def test_oversized_cover_is_abandoned_early(run, cover_server, tmp_path, path):
+    cache = CoverCache(str(tmp_path), 1024 * 1024)
+
+    async def test():
+        with pytest.raises(CoverUnavailable, match="larger than"):
+            await cache.get(f"{cover_server}{path}", "small")
+
+    run(test)
+    assert cache.stats["upstream_errors"] == 1
+    # The stub stops at its first write after the hang-up; what it got out before
+    # that is whatever the socket buffers took, far short of the whole body
+    assert CoverStub.sent[path] < CHUNKS * CHUNK // 2
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.book import Book, BookStatus
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import swaps
+
+async def add_user(db, name, points=0):
+    user = User(username=name, email=f"{name}@example.com", password_hash="x", points=points)
+    db.add(user)
+    await db.flush()
+    return user
+
+async def add_book(db, owner, isbn):
+    book = Book(title=f"Book {isbn}", author="", isbn=isbn, condition="Good", owner_id=owner.id, status=BookStatus.AVAILABLE)
+    db.add(book)
+    await db.flush()
+    return book
+
+async def attempt(coro):
+    try:
+        return await coro
+    except swaps.SwapError as exc:
+        return exc
+
+def test_concurrent_requests_for_one_book_have_one_winner(run):
+    async def test():
+        async with AsyncSessionLocal() as db:
+            owner = await add_user(db, "owner")
+            book = await add_book(db, owner, "111")
+            requesters = [await add_user(db, f"reader{i}", points=1) for i in range(30)]
+            await db.commit()
+
+        async def request(user_id):
+            async with AsyncSessionLocal() as db:
+                return await attempt(swaps.request_book(db, user_id, book.id, None))
+
+        results = await asyncio.gather(*(request(user.id) for user in requesters))
+        winners = [r for r in results if isinstance(r, Transaction)]
+        assert len(winners) == 1
+        assert all(r.status_code == 400 and r.detail == "Book is not available" for r in results if r not in winners)
+
+        async with AsyncSessionLocal() as db:
+            assert await db.scalar(select(Book.status).where(Book.id == book.id)) == BookStatus.PENDING
+            assert await db.scalar(select(func.count(Transaction.id))) == 1
+            # Only the winner paid a point
+            assert await db.scalar(select(func.sum(User.points))) == len(requesters) - 1
+
+    run(test)
+
+def test_crossed_barters_have_one_winner(run):
+    async def test():
+        async with AsyncSessionLocal() as db:
+            alice, bob = await add_user(db, "alice"), await add_user(db, "bob")
+            x, y = await add_book(db, alice, "111"), await add_book(db, bob, "222")
+            await db.commit()
+
+        async def request(user_id, book_id, offered_book_id):
+            async with AsyncSessionLocal() as db:
+                return await attempt(swaps.request_book(db, user_id, book_id, offered_book_id))
+
+        results = await asyncio.gather(request(alice.id, y.id, x.id), request(bob.id, x.id, y.id))
+        assert sum(isinstance(r, Transaction) for r in results) == 1
+        assert [r.status_code for r in results if isinstance(r, swaps.SwapError)] == [400]
+
+        async with AsyncSessionLocal() as db:
+            assert set(await db.scalars(select(Book.status))) == {BookStatus.PENDING}
+
+    run(test)
+
+@pytest.mark.parametrize("requested_first", [True, False])
+def test_request_claims_books_in_id_order(run, monkeypatch, requested_first):
+    # Opposite claim orders are what let two crossed barters deadlock on PostgreSQL
+    claimed = []
+    claim_book = swaps._claim_book
+
+    async def recording_claim(db, book_id, *conditions):
+        claimed.append(book_id)
+        return await claim_book(db, book_id, *conditions)
+
+    monkeypatch.setattr(swaps, "_claim_book", recording_claim)
+
+    async def test():
+        async with AsyncSessionLocal() as db:
+            alice, bob = await add_user(db, "alice"), await add_user(db, "bob")
+            low, high = await add_book(db, alice, "111"), await add_book(db, bob, "222")
+            if requested_first:
+                low.owner_id, high.owner_id = bob.id, alice.id
+            await db.commit()
+            wanted, offered = (low, high) if requested_first else (high, low)
+            await swaps.request_book(db, alice.id, wanted.id, offered.id)
+        assert claimed == [low.id, high.id]
+
+    run(test)
+
+def test_refused_claim_is_explained(run):
+    async def test():
+        async with AsyncSessionLocal() as db:
+            alice, bob = await add_user(db, "alice"), await add_user(db, "bob")
+            mine, theirs = await add_book(db, alice, "111"), await add_book(db, bob, "222")
+            await db.commit()
+            # A refused request rolls back and expires the session's objects
+            alice_id, mine_id, theirs_id = alice.id, mine.id, theirs.id
+            errors = [
+                await attempt(swaps.request_book(db, alice_id, mine_id, None)),
+                await attempt(swaps.request_book(db, alice_id, theirs_id, theirs_id)),
+                await attempt(swaps.request_book(db, alice_id, theirs_id, 999)),
+                await attempt(swaps.request_book(db, alice_id, 999, mine_id)),
+            ]
+        assert [(e.status_code, e.detail) for e in errors] == [
+            (400, "Cannot request your own book"),
+            (403, "You do not own the offered book"),
+            (404, "Offered book not found"),
+            (404, "Book not found"),
+        ]
+        async with AsyncSessionLocal() as db:
+            assert set(await db.scalars(select(Book.status))) == {BookStatus.AVAILABLE}
+
+    run(test)
@@ -0,0 +1,83 @@
+import httpx
+from sqlalchemy import func, select
+
+from app.api.routes import books as book_routes
+from app.core.cache import MISSING
+from app.core.database import AsyncSessionLocal
+from app.main import app
+from app.models.book import Book, BookStatus
+from app.models.transaction import Transaction, TransactionStatus
+from app.models.user import User
+from app.services import enrichment
+from app.services.user_stats import find_drifted_users
+
+KNOWN = {
+    "111": {"title": "Dune", "author": "Frank Herbert", "image_url": None},
+    "222": {"title": "Emma", "author": "Jane Austen", "image_url": None},
+    "333": {"title": "Ulysses", "author": "James Joyce", "image_url": None},
+}
+
+async def peek(isbn, db):
+    # Anything not in KNOWN is left to the enrichment workers
+    return KNOWN.get(isbn, MISSING)
+
+async def not_found(isbn, db, strict=False):
+    return None
+
+async def sign_up(client, name):
+    await client.post("/auth/register", json={"email": f"{name}@example.com", "username": name, "password": "password1"})
+    response = await client.post("/auth/login", data={"username": f"{name}@example.com", "password": "password1"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def live_counts(db, user_id):
+    listed = await db.scalar(select(func.count(Book.id)).where(Book.owner_id == user_id))
+    swapped = await db.scalar(
+        select(func.count(Transaction.id))
+        .where(Transaction.receiver_id == user_id, Transaction.status == TransactionStatus.COMPLETED)
+    )
+    return listed, swapped
+
+def test_counters_match_live_counts(run, monkeypatch):
+    monkeypatch.setattr(book_routes, "peek_book_metadata", peek)
+    monkeypatch.setattr(enrichment, "peek_book_metadata", peek)
+    monkeypatch.setattr(enrichment, "get_book_metadata", not_found)
+
+    async def test():
+        # The lifespan isn't run, so no enrichment workers race the one driven below
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            alice, bob = await sign_up(client, "alice"), await sign_up(client, "bob")
+
+            async def list_book(headers, isbn):
+                response = await client.post("/books/", json={"isbn": isbn, "condition": "Good"}, headers=headers)
+                assert response.status_code == 200
+                return response.json()
+
+            wanted = await list_book(alice, "111")
+            await list_book(alice, "222")
+            pending = await list_book(alice, "999")
+            offered = await list_book(bob, "333")
+            assert pending["status"] == BookStatus.PENDING_METADATA.value
+
+            # Bob trades his book for Alice's, all the way to COMPLETED
+            tx = (await client.post(
+                "/transactions/request", json={"book_id": wanted["id"], "offered_book_id": offered["id"]}, headers=bob
+            )).json()
+            assert (await client.put(f"/transactions/{tx['id']}/accept", headers=alice)).status_code == 200
+            assert (await client.put(f"/transactions/{tx['id']}/ship", json={"tracking_number": "T1"}, headers=alice)).status_code == 200
+            assert (await client.put(f"/transactions/{tx['id']}/confirm", headers=bob)).status_code == 200
+
+        # Google Books doesn't know the pending ISBN: the lookup removes the book
+        queue = enrichment.EnrichmentQueue()
+        job = await queue._claim()
+        assert job.book_id == pending["id"]
+        await queue._process(job)
+
+        async with AsyncSessionLocal() as db:
+            assert await db.get(Book, pending["id"]) is None
+            users = (await db.scalars(select(User).order_by(User.id))).all()
+            assert [(user.books_listed, user.books_swapped) for user in users] == [(2, 0), (1, 1)]
+            for user in users:
+                assert (user.books_listed, user.books_swapped) == await live_counts(db, user.id)
+            assert await find_drifted_users(db) == []
+
+    run(test)